@@ -3,10 +3,18 @@
 from datetime import UTC, datetime, timedelta
 from typing import cast
 
+from sqlalchemy import bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from .models import SpotifyToken, User, UserCreate, UserUpdate
+from .token_cache import invalidate_cached_token
+
+# Lookups run on every login and authenticated request, so their statements
+# are built once; values are bound per call
+SELECT_BY_SPOTIFY_ID = select(User).where(User.spotify_id == bindparam("spotify_id"))
+SELECT_BY_EMAIL = select(User).where(User.email == bindparam("email"))
 
 
 class UserService:
@@ -16,21 +24,23 @@ class UserService:
         self.session = session
 
     async def get_user_by_id(self, user_id: int) -> User | None:
-        """Get user by ID."""
-        statement = select(User).where(User.id == user_id)
-        result = await self.session.execute(statement)
-        return cast(User | None, result.scalar_one_or_none())
+        """Get user by ID.
+
+        Looked up through the session's identity map, so a user already
+        loaded in this session is returned without another query.
+        """
+        return await self.session.get(User, user_id)
 
     async def get_user_by_spotify_id(self, spotify_id: str) -> User | None:
         """Get user by Spotify ID."""
-        statement = select(User).where(User.spotify_id == spotify_id)
-        result = await self.session.execute(statement)
+        result = await self.session.execute(
+            SELECT_BY_SPOTIFY_ID, {"spotify_id": spotify_id}
+        )
         return cast(User | None, result.scalar_one_or_none())
 
     async def get_user_by_email(self, email: str) -> User | None:
         """Get user by email."""
-        statement = select(User).where(User.email == email)
-        result = await self.session.execute(statement)
+        result = await self.session.execute(SELECT_BY_EMAIL, {"email": email})
         return cast(User | None, result.scalar_one_or_none())
 
     async def create_user(self, user_data: UserCreate) -> User:
@@ -78,54 +88,61 @@ class UserService:
     async def create_or_update_user_from_spotify(
         self, spotify_user: dict, spotify_token: SpotifyToken
     ) -> User:
-        """Create or update user from Spotify profile data."""
-        existing_user = await self.get_user_by_spotify_id(spotify_user["id"])
-
-        if existing_user:
-            # Update existing user
-            existing_user.email = spotify_user.get("email", existing_user.email)
-            existing_user.display_name = spotify_user.get(
-                "display_name", existing_user.display_name
-            )
-            existing_user.country = spotify_user.get("country", existing_user.country)
-
-            # Update image URL if available
-            if spotify_user.get("images") and len(spotify_user["images"]) > 0:
-                existing_user.image_url = spotify_user["images"][0]["url"]
-
-            # Update tokens
-            existing_user.access_token = spotify_token.access_token
-            existing_user.refresh_token = spotify_token.refresh_token
-            existing_user.token_expires_at = datetime.now(UTC) + timedelta(
-                seconds=spotify_token.expires_in
-            )
-            existing_user.updated_at = datetime.now(UTC)
-
-            await self.session.commit()
-            await self.session.refresh(existing_user)
-            return existing_user
-        else:
-            # Create new user
-            image_url = None
-            if spotify_user.get("images") and len(spotify_user["images"]) > 0:
-                image_url = spotify_user["images"][0]["url"]
-
-            user_data = UserCreate(
-                spotify_id=spotify_user["id"],
-                email=spotify_user.get("email", ""),
-                display_name=spotify_user.get("display_name"),
-                country=spotify_user.get("country"),
-                image_url=image_url,
-            )
-
-            user = User(**user_data.model_dump())
-            user.access_token = spotify_token.access_token
-            user.refresh_token = spotify_token.refresh_token
-            user.token_expires_at = datetime.now(UTC) + timedelta(
-                seconds=spotify_token.expires_in
+        """Create or update user from Spotify profile data.
+
+        Done as one INSERT ... ON CONFLICT (spotify_id) DO UPDATE, so a
+        returning user's login costs a single statement instead of a SELECT
+        followed by an UPDATE.
+        """
+        image_url = None
+        if spotify_user.get("images") and len(spotify_user["images"]) > 0:
+            image_url = spotify_user["images"][0]["url"]
+
+        user_data = UserCreate(
+            spotify_id=spotify_user["id"],
+            email=spotify_user.get("email", ""),
+            display_name=spotify_user.get("display_name"),
+            country=spotify_user.get("country"),
+            image_url=image_url,
+        )
+        user = User(
+            **user_data.model_dump(),
+            access_token=spotify_token.access_token,
+            refresh_token=spotify_token.refresh_token,
+            token_expires_at=datetime.now(UTC)
+            + timedelta(seconds=spotify_token.expires_in),
+        )
+        values = user.model_dump(exclude={"id"})
+
+        # An existing user keeps profile fields Spotify did not send, and
+        # their image unless a new one was sent
+        update_fields = ["access_token", "refresh_token", "token_expires_at"]
+        update_fields += [
+            field
+            for field in ("email", "display_name", "country")
+            if field in spotify_user
+        ]
+        if image_url is not None:
+            update_fields.append("image_url")
+
+        statement = (
+            pg_insert(User)
+            .values(**values)
+            .on_conflict_do_update(
+                index_elements=["spotify_id"],
+                set_={
+                    **{field: values[field] for field in update_fields},
+                    "updated_at": datetime.now(UTC),
+                },
             )
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(statement)
+        user = result.scalar_one()
 
-            self.session.add(user)
-            await self.session.commit()
-            await self.session.refresh(user)
-            return user
+        await self.session.commit()
+        # The login stored new tokens; drop any copy cached for the old ones
+        invalidate_cached_token(user.id)
+        await self.session.refresh(user)
+        return user
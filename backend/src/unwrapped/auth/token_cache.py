@@ -0,0 +1,34 @@
+"""Process-wide cache of users' Spotify access tokens.
+
+Services are constructed per request, so the cache lives at module level. It
+sits in the auth package so logins can invalidate it without importing the
+music services that fill it.
+"""
+
+from datetime import datetime
+
+# user_id -> (access_token, expires_at)
+_token_cache: dict[int, tuple[str, datetime]] = {}
+
+
+def get_cached_token(user_id: int, valid_until: datetime) -> str | None:
+    """Return the cached access token if it is still valid at valid_until."""
+    cached = _token_cache.get(user_id)
+    if cached and cached[1] > valid_until:
+        return cached[0]
+    return None
+
+
+def cache_token(user_id: int, access_token: str, expires_at: datetime) -> None:
+    """Remember a user's access token until it expires."""
+    _token_cache[user_id] = (access_token, expires_at)
+
+
+def invalidate_cached_token(user_id: int) -> None:
+    """Forget a user's access token, e.g. after a login or a Spotify 401."""
+    _token_cache.pop(user_id, None)
+
+
+def clear_token_cache() -> None:
+    """Forget all cached access tokens."""
+    _token_cache.clear()
@@ -16,6 +16,12 @@ class Settings(BaseSettings):
     spotify_redirect_uri: str = "https://127.0.0.1:8443/api/v1/auth/callback"
     frontend_url: str = "https://127.0.0.1:5174"
 
+    # Outbound throttling to stay under Spotify and AI provider rate limits
+    spotify_requests_per_second: float = 10.0
+    spotify_max_concurrent_fetches: int = 8
+    spotify_max_requests_per_user: int = 5
+    ai_max_concurrent_requests: int = 4
+
     # AI Configuration (DeepSeek)
     deepseek_api_key: str = "your_deepseek_api_key_here"
     deepseek_base_url: str = "https://api.deepseek.com"
@@ -24,3 +24,8 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
     finally:
         await session.close()
+
+
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    """Get session factory for work that outlives the request, e.g. background tasks."""
+    return async_session_maker
@@ -108,7 +108,7 @@ def log_error_with_context(
 ) -> None:
     """Log errors with additional context."""
     extra = {"user_id": user_id, "request_id": request_id, "error_context": context}
-    logger.error(f"Error occurred: {str(error)}", exc_info=True, extra=extra)
+    logger.error(f"Error occurred: {str(error)}", exc_info=error, extra=extra)
 
 
 # Initialize logging when module is imported
@@ -3,7 +3,7 @@
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
-from jose import JWTError, jwt
+import jwt
 from passlib.context import CryptContext
 
 from .config import settings
@@ -39,7 +39,7 @@ def verify_token(token: str | None) -> dict[str, Any] | None:
             token, settings.secret_key, algorithms=[settings.algorithm]
         )
         return dict(payload)
-    except JWTError:
+    except jwt.InvalidTokenError:
         return None
 
 
@@ -1,17 +1,34 @@
 """Main FastAPI application entry point."""
 
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from .auth import auth_router
 from .core.config import settings
+from .core.exceptions import SpotifyAPIError
+from .music.analysis_events import analysis_event_listener
 from .music.analyze_router import router as analyze_router
 from .music.public_router import router as public_router
+from .music.spotify import spotify_music_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Release shared connections on shutdown."""
+    yield
+    await spotify_music_client.close()
+    await analysis_event_listener.close()
+
 
 app = FastAPI(
     title="unwrapped.fm",
     description="AI-powered music taste analysis - get your Spotify listening habits brutally judged",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS with dynamic origins based on environment
@@ -23,6 +40,26 @@ app.add_middleware(  # type: ignore[arg-type]
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(SpotifyAPIError)
+async def spotify_api_error_handler(
+    request: Request, exc: SpotifyAPIError
+) -> JSONResponse:
+    """Report failures of upstream services (Spotify, AI) as bad gateway.
+
+    Errors raised with an explicit status, such as rate limits (429) or
+    missing analyses (404), keep it.
+    """
+    status_code = (
+        status.HTTP_502_BAD_GATEWAY
+        if exc.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        else exc.status_code
+    )
+    return JSONResponse(
+        status_code=status_code, content={"detail": exc.detail}, headers=exc.headers
+    )
+
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(analyze_router, prefix="/api/v1")
@@ -1,6 +1,7 @@
 """AI client for music taste analysis using DeepSeek."""
 
 import json
+from collections import Counter
 from typing import Any
 
 from openai import AsyncOpenAI
@@ -8,6 +9,7 @@ from openai import AsyncOpenAI
 from ..core.config import settings
 from ..core.exceptions import SpotifyAPIError
 from ..core.logging import get_logger
+from .spotify_data_collector import TIME_RANGES
 
 
 class MusicAnalysisAI:
@@ -35,8 +37,8 @@ class MusicAnalysisAI:
             user_prompt = self._create_user_prompt(music_summary)
             self.logger.info(f"User prompt: {user_prompt}")
 
-            # Call DeepSeek API
-            response = await self.client.chat.completions.create(  # type: ignore[arg-type]
+            # Call DeepSeek API, streaming so we can stop once the JSON is complete
+            stream = await self.client.chat.completions.create(  # type: ignore[arg-type]
                 model="deepseek-chat",
                 messages=[  # type: ignore[arg-type]
                     {"role": "system", "content": system_prompt},
@@ -45,14 +47,11 @@ class MusicAnalysisAI:
                 response_format={"type": "json_object"},  # type: ignore[arg-type]
                 max_tokens=1000,
                 temperature=0.9,  # Add some creativity for witty responses
+                stream=True,
             )
 
             # Parse the JSON response
-            content = response.choices[0].message.content
-            if not content:
-                raise SpotifyAPIError("Empty response from AI")
-
-            analysis_result = json.loads(content)
+            analysis_result = await self._read_json_stream(stream)
 
             # Validate the response format
             required_fields = [
@@ -80,6 +79,36 @@ class MusicAnalysisAI:
         except Exception as e:
             raise SpotifyAPIError(f"AI analysis failed: {e}") from e
 
+    async def _read_json_stream(self, stream: Any) -> dict[str, Any]:
+        """Read streamed completion deltas until a full JSON object has arrived.
+
+        JSON mode may pad the object with whitespace up to max_tokens, so the
+        stream is closed as soon as the object parses instead of at its end.
+        """
+        decoder = json.JSONDecoder()
+        content = ""
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                content += delta
+                if "}" in delta:
+                    try:
+                        result, _ = decoder.raw_decode(content.lstrip())
+                    except json.JSONDecodeError:
+                        continue  # Brace inside a string or nested object
+                    return result
+        finally:
+            await stream.close()
+
+        if not content:
+            raise SpotifyAPIError("Empty response from AI")
+        # Stream ended without a complete object; surface the decode error
+        return json.loads(content)
+
     def _prepare_music_summary(self, music_data: dict[str, Any]) -> dict[str, Any]:
         """Prepare a comprehensive summary of the user's music data for AI analysis."""
         summary: dict[str, Any] = {
@@ -101,8 +130,9 @@ class MusicAnalysisAI:
         artist_ids = set()
         all_popularities = []
         all_genres = set()
+        artist_appearances: Counter[str] = Counter()
 
-        for time_range in ["short_term", "medium_term", "long_term"]:
+        for time_range in TIME_RANGES:
             tracks = music_data.get(f"top_tracks_{time_range}", {}).get("items", [])
             artists = music_data.get(f"top_artists_{time_range}", {}).get("items", [])
 
@@ -129,12 +159,14 @@ class MusicAnalysisAI:
             ]
 
             # Collect unique tracks and artists
-            for track in tracks:
-                track_ids.add(track.get("id", ""))
-                all_popularities.append(track.get("popularity", 0))
+            track_ids.update(track.get("id", "") for track in tracks)
+            all_popularities.extend(track.get("popularity", 0) for track in tracks)
 
             for artist in artists:
-                artist_ids.add(artist.get("id", ""))
+                artist_id = artist.get("id", "")
+                artist_ids.add(artist_id)
+                if artist_id:
+                    artist_appearances[artist_id] += 1
                 artist_genres = artist.get("genres", [])
                 all_genres.update(artist_genres)
                 summary["genres"].update(artist_genres)
@@ -158,17 +190,6 @@ class MusicAnalysisAI:
         if all_popularities:
             summary["mainstream_score"] = summary["popularity_stats"]["avg"] / 100
 
-        # Calculate artist loyalty (how often same artists appear across time ranges)
-        artist_appearances = {}
-        for time_range in ["short_term", "medium_term", "long_term"]:
-            artists = music_data.get(f"top_artists_{time_range}", {}).get("items", [])
-            for artist in artists:
-                artist_id = artist.get("id", "")
-                if artist_id:
-                    artist_appearances[artist_id] = (
-                        artist_appearances.get(artist_id, 0) + 1
-                    )
-
         # Artist loyalty score: percentage of artists that appear in multiple time ranges
         if artist_appearances:
             loyal_artists = sum(1 for count in artist_appearances.values() if count > 1)
@@ -272,3 +293,7 @@ LISTENING PATTERNS BY TIME PERIOD:"""
         prompt += "\n\nBased on this data, provide a witty, sarcastic analysis of their music taste in JSON format. Ensure the rating description is between 200 and 400 words."
 
         return prompt
+
+
+# Global client instance, shared so the underlying HTTP connection pool is reused
+music_analysis_ai = MusicAnalysisAI()
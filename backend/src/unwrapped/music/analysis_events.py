@@ -0,0 +1,215 @@
+"""Analysis status events over PostgreSQL LISTEN/NOTIFY."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import orjson
+from sqlalchemy import Row, Select, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from ..core.database import engine
+from ..core.logging import get_logger
+from .models import AnalysisStatus, MusicAnalysisResult
+
+logger = get_logger(__name__)
+
+# Statuses after which no further notifications will be sent
+TERMINAL_STATUSES = frozenset({AnalysisStatus.COMPLETED, AnalysisStatus.FAILED})
+
+# Seconds between SSE keepalive comments while waiting for a notification
+KEEPALIVE_INTERVAL = 15.0
+
+# Seconds after which a stream is closed even if the analysis is still running
+MAX_STREAM_DURATION = 300.0
+
+
+def analysis_channel(analysis_id: int) -> str:
+    """Get the NOTIFY channel name for an analysis."""
+    return f"analysis_{analysis_id}"
+
+
+async def notify_analysis_status(
+    session: AsyncSession, analysis_id: int, status: AnalysisStatus
+) -> None:
+    """
+    Queue a status notification for listeners of an analysis.
+
+    Postgres delivers the notification when the surrounding transaction
+    commits, so call this before the session's commit.
+    """
+    await session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": analysis_channel(analysis_id), "payload": status.value},
+    )
+
+
+def _format_event(analysis_id: int, status: AnalysisStatus) -> str:
+    """Format a status change as a server-sent event."""
+    data = orjson.dumps({"analysis_id": analysis_id, "status": status.value})
+    return f"event: status\ndata: {data.decode()}\n\n"
+
+
+class AnalysisEventListener:
+    """
+    One LISTEN connection per process, fanned out to per-stream queues.
+
+    Every event stream subscribes here instead of holding its own pooled
+    connection, so open streams cost a queue each rather than a connection.
+    Status re-reads go over the same autocommit connection.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self._engine = engine
+        self._connection: AsyncConnection | None = None
+        # asyncpg runs one operation per connection at a time
+        self._lock = asyncio.Lock()
+        self._subscribers: dict[int, set[asyncio.Queue[str]]] = {}
+
+    def _on_notify(
+        self, _connection: Any, _pid: int, channel: str, payload: str
+    ) -> None:
+        analysis_id = int(channel.removeprefix("analysis_"))
+        for queue in self._subscribers.get(analysis_id, ()):
+            queue.put_nowait(payload)
+
+    async def _listener(self) -> Any:
+        """Get the asyncpg connection, (re)connecting if needed; hold the lock."""
+        if self._connection is not None:
+            raw_connection = await self._connection.get_raw_connection()
+            if not raw_connection.driver_connection.is_closed():
+                return raw_connection.driver_connection
+            await self._connection.invalidate()
+
+        connection = await self._engine.connect()
+        # Outside a transaction, so notifications are delivered as they arrive
+        self._connection = await connection.execution_options(
+            isolation_level="AUTOCOMMIT"
+        )
+        raw_connection = await self._connection.get_raw_connection()
+        listener = raw_connection.driver_connection
+        # Channels subscribed before a lost connection need LISTEN again
+        for analysis_id in self._subscribers:
+            await listener.add_listener(analysis_channel(analysis_id), self._on_notify)
+        return listener
+
+    async def subscribe(self, analysis_id: int) -> asyncio.Queue[str]:
+        """Start receiving status notifications for an analysis."""
+        queue: asyncio.Queue[str] = asyncio.Queue()
+        async with self._lock:
+            listener = await self._listener()
+            subscribers = self._subscribers.setdefault(analysis_id, set())
+            if not subscribers:
+                await listener.add_listener(
+                    analysis_channel(analysis_id), self._on_notify
+                )
+            subscribers.add(queue)
+        return queue
+
+    async def unsubscribe(self, analysis_id: int, queue: asyncio.Queue[str]) -> None:
+        """Stop delivering to a queue; UNLISTEN once nobody follows the analysis."""
+        async with self._lock:
+            subscribers = self._subscribers.get(analysis_id)
+            if subscribers is None:
+                return
+            subscribers.discard(queue)
+            if subscribers:
+                return
+            del self._subscribers[analysis_id]
+            if self._connection is not None:
+                listener = await self._listener()
+                await listener.remove_listener(
+                    analysis_channel(analysis_id), self._on_notify
+                )
+
+    async def _first(self, stmt: Select[Any]) -> Row[Any] | None:
+        """Run a query over the listening connection and return its first row."""
+        async with self._lock:
+            await self._listener()
+            assert self._connection is not None
+            return (await self._connection.execute(stmt)).first()
+
+    async def user_analysis(self, user_id: int) -> tuple[int, AnalysisStatus] | None:
+        """Read the id and status of a user's analysis over the listening connection.
+
+        Lets the events endpoint start a stream without checking out a pooled
+        connection that would stay open for the stream's lifetime.
+        """
+        row = await self._first(
+            select(MusicAnalysisResult.id, MusicAnalysisResult.status).where(
+                MusicAnalysisResult.user_id == user_id
+            )
+        )
+        return None if row is None else (row.id, row.status)
+
+    async def current_status(self, analysis_id: int) -> AnalysisStatus | None:
+        """Read the stored status of an analysis over the listening connection."""
+        row = await self._first(
+            select(MusicAnalysisResult.status).where(
+                MusicAnalysisResult.id == analysis_id
+            )
+        )
+        return None if row is None else row.status
+
+    async def close(self) -> None:
+        """Close the listening connection."""
+        async with self._lock:
+            if self._connection is not None:
+                await self._connection.close()
+                self._connection = None
+
+
+analysis_event_listener = AnalysisEventListener(engine)
+
+
+def get_analysis_event_listener() -> AnalysisEventListener:
+    """Get the process-wide analysis event listener."""
+    return analysis_event_listener
+
+
+async def stream_analysis_events(
+    listener: AnalysisEventListener, analysis_id: int, status: AnalysisStatus
+) -> AsyncIterator[str]:
+    """
+    Stream status events for an analysis until it completes or fails.
+
+    Streams close after MAX_STREAM_DURATION even if the analysis is still
+    running; EventSource clients reconnect and pick up the current status.
+
+    Args:
+        listener: Listener delivering the analysis' notifications
+        analysis_id: ID of the analysis to follow
+        status: Status already known to the caller
+
+    Yields:
+        Server-sent event strings
+    """
+    if status in TERMINAL_STATUSES:
+        yield _format_event(analysis_id, status)
+        return
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + MAX_STREAM_DURATION
+    queue = await listener.subscribe(analysis_id)
+    try:
+        # Re-read after subscribing so a transition that happened before
+        # LISTEN took effect is not missed
+        status = await listener.current_status(analysis_id) or status
+        yield _format_event(analysis_id, status)
+
+        while status not in TERMINAL_STATUSES:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                payload = await asyncio.wait_for(
+                    queue.get(), timeout=min(KEEPALIVE_INTERVAL, remaining)
+                )
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            status = AnalysisStatus(payload)
+            yield _format_event(analysis_id, status)
+    finally:
+        await listener.unsubscribe(analysis_id, queue)
@@ -2,11 +2,14 @@
 
 from datetime import UTC, datetime
 
-from fastapi import BackgroundTasks, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import desc, select
+from fastapi import BackgroundTasks, Depends, HTTPException
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import select
 
+from ..core.database import async_session_maker, get_session, get_session_maker
 from ..core.logging import get_logger
+from .analysis_coordinator import AnalysisCoordinator
 from .background_tasks import process_music_analysis_task
 from .models import (
     AnalysisStatus,
@@ -21,8 +24,13 @@ from .models import (
 class MusicAnalysisService:
     """Service for analyzing user's music taste with AI."""
 
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+    ):
         self.session = session
+        self.session_maker = session_maker
         self.logger = get_logger(__name__)
 
     async def begin_analysis(
@@ -38,13 +46,31 @@ class MusicAnalysisService:
         Returns:
             BeginAnalysisResponse with analysis ID and status
         """
-        # Check for existing analysis by user_id (unique constraint ensures max 1)
-        stmt = select(MusicAnalysisResult).where(MusicAnalysisResult.user_id == user_id)
+        # Insert a pending analysis unless one already exists for the user
+        # (unique constraint on user_id ensures max 1). A single UPSERT keeps
+        # concurrent begin calls race-free and costs one round trip.
+        now = datetime.now(UTC)
+        stmt = (
+            pg_insert(MusicAnalysisResult)
+            .values(
+                user_id=user_id,
+                status=AnalysisStatus.PENDING,
+                shared_at=now,
+                created_at=now,
+            )
+            .on_conflict_do_nothing(index_elements=["user_id"])
+            .returning(MusicAnalysisResult.id)
+        )
         result = await self.session.execute(stmt)
-        existing_analysis = result.scalar_one_or_none()
+        analysis_id = result.scalar_one_or_none()
+        await self.session.commit()
 
-        if existing_analysis:
+        if analysis_id is None:
             # Return existing analysis regardless of status
+            stmt = select(MusicAnalysisResult.id, MusicAnalysisResult.status).where(
+                MusicAnalysisResult.user_id == user_id
+            )
+            existing_analysis = (await self.session.execute(stmt)).one()
             self.logger.info(
                 f"Returning existing analysis for user {user_id}, status: {existing_analysis.status}"
             )
@@ -53,31 +79,32 @@ class MusicAnalysisService:
                 status=existing_analysis.status,
             )
 
-        # Create new analysis record with pending status
-        new_analysis = MusicAnalysisResult(
-            user_id=user_id,
-            status=AnalysisStatus.PENDING,
-            created_at=datetime.now(UTC),
-        )
-
-        self.session.add(new_analysis)
-        await self.session.commit()
-        await self.session.refresh(new_analysis)
-
         # Start background task
         background_tasks.add_task(
-            process_music_analysis_task, new_analysis.id, user_id, self.session
+            process_music_analysis_task, analysis_id, user_id, self.session_maker
         )
 
         self.logger.info(
-            f"Created new analysis {new_analysis.id} for user {user_id}, starting background task"
+            f"Created new analysis {analysis_id} for user {user_id}, starting background task"
         )
 
         return BeginAnalysisResponse(
-            analysis_id=new_analysis.id,
+            analysis_id=analysis_id,
             status=AnalysisStatus.PENDING,
         )
 
+    async def analyze_user_music_taste(self, user_id: int) -> MusicAnalysisResponse:
+        """
+        Run a synchronous music taste analysis for user.
+
+        Args:
+            user_id: ID of the user requesting analysis
+
+        Returns:
+            MusicAnalysisResponse with the persisted analysis
+        """
+        return await AnalysisCoordinator(self.session).analyze_user_music_taste(user_id)
+
     async def poll_analysis(self, user_id: int) -> AnalysisStatusResponse:
         """
         Get current status of user's analysis.
@@ -173,11 +200,17 @@ class MusicAnalysisService:
             HTTPException: If share token not found
         """
         try:
-            stmt = select(MusicAnalysisResult).where(
-                MusicAnalysisResult.share_token == share_token
-            )
+            stmt = select(
+                MusicAnalysisResult.status,
+                MusicAnalysisResult.rating_text,
+                MusicAnalysisResult.rating_description,
+                MusicAnalysisResult.critical_acclaim_score,
+                MusicAnalysisResult.music_snob_score,
+                MusicAnalysisResult.created_at,
+                MusicAnalysisResult.completed_at,
+            ).where(MusicAnalysisResult.share_token == share_token)
             result = await self.session.execute(stmt)
-            analysis = result.scalar_one_or_none()
+            analysis = result.first()
 
             if not analysis:
                 self.logger.warning(f"Share token not found: {share_token}")
@@ -227,15 +260,21 @@ class MusicAnalysisService:
             HTTPException: On database errors
         """
         try:
-            stmt = (
-                select(MusicAnalysisResult)
-                .where(MusicAnalysisResult.user_id == user_id)
-                .order_by(desc(MusicAnalysisResult.created_at))
-                .limit(1)
-            )
+            # user_id is UNIQUE, so its index already yields the only row.
+            # Select only the response columns to skip ORM entity loading.
+            stmt = select(
+                MusicAnalysisResult.status,
+                MusicAnalysisResult.rating_text,
+                MusicAnalysisResult.rating_description,
+                MusicAnalysisResult.critical_acclaim_score,
+                MusicAnalysisResult.music_snob_score,
+                MusicAnalysisResult.share_token,
+                MusicAnalysisResult.created_at,
+                MusicAnalysisResult.completed_at,
+            ).where(MusicAnalysisResult.user_id == user_id)
 
             result = await self.session.execute(stmt)
-            analysis = result.scalar_one_or_none()
+            analysis = result.first()
 
             if not analysis:
                 return None
@@ -264,3 +303,11 @@ class MusicAnalysisService:
         except Exception as e:
             self.logger.error(f"Failed to get latest analysis for user {user_id}: {e}")
             raise HTTPException(status_code=500, detail="Internal server error") from e
+
+
+def get_analysis_service(
+    session: AsyncSession = Depends(get_session),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+) -> MusicAnalysisService:
+    """Get music analysis service bound to the request's database session."""
+    return MusicAnalysisService(session, session_maker)
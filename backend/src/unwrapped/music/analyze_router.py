@@ -1,15 +1,18 @@
 """Music analysis API router for AI-powered music taste analysis."""
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
-from ..core.database import get_session
 from ..core.dependencies import get_current_user_id
-from ..core.exceptions import SpotifyAPIError
-from .analysis_service import MusicAnalysisService
+from .analysis_events import (
+    AnalysisEventListener,
+    get_analysis_event_listener,
+    stream_analysis_events,
+)
+from .analysis_service import MusicAnalysisService, get_analysis_service
 from .models import AnalysisStatusResponse, BeginAnalysisResponse, MusicAnalysisResponse
 
-router = APIRouter(tags=["music-analysis"])
+router = APIRouter(tags=["music-analysis"], default_response_class=ORJSONResponse)
 
 
 # New background task endpoints
@@ -18,51 +21,51 @@ router = APIRouter(tags=["music-analysis"])
 @router.post("/music/analysis/begin", response_model=BeginAnalysisResponse)
 async def begin_analysis(
     background_tasks: BackgroundTasks,
-    session: AsyncSession = Depends(get_session),
+    analysis_service: MusicAnalysisService = Depends(get_analysis_service),
     current_user_id: int = Depends(get_current_user_id),
 ) -> BeginAnalysisResponse:
     """Begin music analysis for user. Returns existing analysis if found, creates new if none exists."""
-    try:
-        analysis_service = MusicAnalysisService(session)
-        return await analysis_service.begin_analysis(current_user_id, background_tasks)
-    except SpotifyAPIError as e:
-        raise HTTPException(status_code=502, detail=str(e)) from e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Internal server error") from e
+    return await analysis_service.begin_analysis(current_user_id, background_tasks)
 
 
 @router.get("/music/analysis/status", response_model=AnalysisStatusResponse)
 async def poll_analysis(
-    session: AsyncSession = Depends(get_session),
+    analysis_service: MusicAnalysisService = Depends(get_analysis_service),
     current_user_id: int = Depends(get_current_user_id),
 ) -> AnalysisStatusResponse:
     """Get current status of user's music analysis."""
-    try:
-        analysis_service = MusicAnalysisService(session)
-        return await analysis_service.poll_analysis(current_user_id)
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions from service
-    except SpotifyAPIError as e:
-        raise HTTPException(status_code=502, detail=str(e)) from e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Internal server error") from e
+    return await analysis_service.poll_analysis(current_user_id)
+
+
+@router.get("/music/analysis/events")
+async def stream_analysis_status(
+    listener: AnalysisEventListener = Depends(get_analysis_event_listener),
+    current_user_id: int = Depends(get_current_user_id),
+) -> StreamingResponse:
+    """Stream status changes of user's music analysis as server-sent events.
+
+    Reads the analysis over the event listener's connection rather than a
+    request session, which would stay checked out until the stream ends.
+    """
+    analysis = await listener.user_analysis(current_user_id)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="No analysis found for user")
+    analysis_id, status = analysis
+
+    return StreamingResponse(
+        stream_analysis_events(listener, analysis_id, status),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/music/analysis/result", response_model=MusicAnalysisResponse)
 async def get_analysis(
-    session: AsyncSession = Depends(get_session),
+    analysis_service: MusicAnalysisService = Depends(get_analysis_service),
     current_user_id: int = Depends(get_current_user_id),
 ) -> MusicAnalysisResponse:
     """Get completed music analysis result for user."""
-    try:
-        analysis_service = MusicAnalysisService(session)
-        return await analysis_service.get_analysis(current_user_id)
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions from service
-    except SpotifyAPIError as e:
-        raise HTTPException(status_code=502, detail=str(e)) from e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Internal server error") from e
+    return await analysis_service.get_analysis(current_user_id)
 
 
 # Existing endpoints (for backward compatibility)
@@ -70,29 +73,17 @@ async def get_analysis(
 
 @router.post("/music/analyze", response_model=MusicAnalysisResponse)
 async def analyze_music_taste(
-    session: AsyncSession = Depends(get_session),
+    analysis_service: MusicAnalysisService = Depends(get_analysis_service),
     current_user_id: int = Depends(get_current_user_id),
 ) -> MusicAnalysisResponse:
     """Analyze user's music taste with AI and return verdict."""
-    try:
-        analysis_service = MusicAnalysisService(session)
-        return await analysis_service.analyze_user_music_taste(current_user_id)
-    except SpotifyAPIError as e:
-        raise HTTPException(status_code=502, detail=str(e)) from e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Internal server error") from e
+    return await analysis_service.analyze_user_music_taste(current_user_id)
 
 
 @router.get("/music/analysis/latest", response_model=MusicAnalysisResponse | None)
 async def get_latest_analysis(
-    session: AsyncSession = Depends(get_session),
+    analysis_service: MusicAnalysisService = Depends(get_analysis_service),
     current_user_id: int = Depends(get_current_user_id),
 ) -> MusicAnalysisResponse | None:
     """Get user's most recent music analysis."""
-    try:
-        analysis_service = MusicAnalysisService(session)
-        return await analysis_service.get_latest_analysis(current_user_id)
-    except SpotifyAPIError as e:
-        raise HTTPException(status_code=502, detail=str(e)) from e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Internal server error") from e
+    return await analysis_service.get_latest_analysis(current_user_id)
@@ -1,12 +1,22 @@
 """Result persistence service for music analysis."""
 
+from datetime import UTC, datetime
+
+from fastapi import status
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import desc, select
+from sqlmodel import select
 
 from ..core.exceptions import SpotifyAPIError
 from ..core.logging import get_logger
 from .models import MusicAnalysisResponse, MusicAnalysisResult, PublicAnalysisResponse
-from .sharing import generate_unique_share_token
+from .sharing import (
+    SHARE_TOKEN_ATTEMPTS,
+    SHARE_TOKEN_CONSTRAINT,
+    generate_share_token,
+    violated_constraint,
+)
 
 
 class ResultPersister:
@@ -21,22 +31,41 @@ class ResultPersister:
     ) -> MusicAnalysisResponse:
         """Save analysis result to database and return response."""
         try:
-            # Generate unique share token
-            share_token = await generate_unique_share_token(self.session)
-
-            # Store result in database
-            db_result = MusicAnalysisResult(
-                user_id=user_id,
-                rating_text=analysis_result["rating_text"],
-                rating_description=analysis_result["rating_description"],
-                critical_acclaim_score=analysis_result["critical_acclaim_score"],
-                music_snob_score=analysis_result["music_snob_score"],
-                share_token=share_token,
-            )
-
-            self.session.add(db_result)
-            await self.session.commit()
-            await self.session.refresh(db_result)
+            # Store result in database with a single INSERT ... RETURNING,
+            # skipping the ORM unit of work and the follow-up refresh.
+            # Timestamp defaults live on the model, not the table, so pass them.
+            # share_token uniqueness is enforced by the database; on the
+            # (practically impossible) collision, retry with a fresh token.
+            for attempt in range(SHARE_TOKEN_ATTEMPTS):
+                share_token = generate_share_token()
+                now = datetime.now(UTC)
+                stmt = (
+                    insert(MusicAnalysisResult)
+                    .values(
+                        user_id=user_id,
+                        rating_text=analysis_result["rating_text"],
+                        rating_description=analysis_result["rating_description"],
+                        critical_acclaim_score=analysis_result[
+                            "critical_acclaim_score"
+                        ],
+                        music_snob_score=analysis_result["music_snob_score"],
+                        share_token=share_token,
+                        shared_at=now,
+                        created_at=now,
+                    )
+                    .returning(MusicAnalysisResult.created_at)
+                )
+                try:
+                    created_at = (await self.session.execute(stmt)).scalar_one()
+                    await self.session.commit()
+                    break
+                except IntegrityError as e:
+                    await self.session.rollback()
+                    if (
+                        violated_constraint(e) != SHARE_TOKEN_CONSTRAINT
+                        or attempt == SHARE_TOKEN_ATTEMPTS - 1
+                    ):
+                        raise
 
             self.logger.info(
                 "Analysis result saved successfully",
@@ -49,12 +78,12 @@ class ResultPersister:
 
             # Return response
             return MusicAnalysisResponse(
-                rating_text=db_result.rating_text,
-                rating_description=db_result.rating_description,
-                critical_acclaim_score=db_result.critical_acclaim_score,
-                music_snob_score=db_result.music_snob_score,
-                share_token=db_result.share_token,
-                analyzed_at=db_result.created_at,
+                rating_text=analysis_result["rating_text"],
+                rating_description=analysis_result["rating_description"],
+                critical_acclaim_score=analysis_result["critical_acclaim_score"],
+                music_snob_score=analysis_result["music_snob_score"],
+                share_token=share_token,
+                analyzed_at=created_at,
             )
 
         except Exception as e:
@@ -63,15 +92,19 @@ class ResultPersister:
     async def get_latest_analysis(self, user_id: int) -> MusicAnalysisResponse | None:
         """Get the user's most recent music analysis."""
         try:
-            stmt = (
-                select(MusicAnalysisResult)
-                .where(MusicAnalysisResult.user_id == user_id)
-                .order_by(desc(MusicAnalysisResult.created_at))
-                .limit(1)
-            )
+            # user_id is UNIQUE, so its index already yields the only row.
+            # Select only the response columns to skip ORM entity loading.
+            stmt = select(
+                MusicAnalysisResult.rating_text,
+                MusicAnalysisResult.rating_description,
+                MusicAnalysisResult.critical_acclaim_score,
+                MusicAnalysisResult.music_snob_score,
+                MusicAnalysisResult.share_token,
+                MusicAnalysisResult.created_at,
+            ).where(MusicAnalysisResult.user_id == user_id)
 
             result = await self.session.execute(stmt)
-            analysis = result.scalar_one_or_none()
+            analysis = result.first()
 
             if not analysis:
                 return None
@@ -93,22 +126,25 @@ class ResultPersister:
     ) -> PublicAnalysisResponse:
         """Get analysis result by share token for public viewing."""
         try:
-            stmt = select(MusicAnalysisResult).where(
-                MusicAnalysisResult.share_token == share_token
-            )
+            stmt = select(
+                MusicAnalysisResult.rating_text,
+                MusicAnalysisResult.rating_description,
+                MusicAnalysisResult.critical_acclaim_score,
+                MusicAnalysisResult.music_snob_score,
+                MusicAnalysisResult.created_at,
+            ).where(MusicAnalysisResult.share_token == share_token)
             result = await self.session.execute(stmt)
-            analysis = result.scalar_one_or_none()
-
-            if not analysis:
-                raise SpotifyAPIError("Analysis not found")
-
-            return PublicAnalysisResponse(
-                rating_text=analysis.rating_text,  # type: ignore[attr-defined]
-                rating_description=analysis.rating_description,  # type: ignore[attr-defined]
-                critical_acclaim_score=analysis.critical_acclaim_score,  # type: ignore[attr-defined]
-                music_snob_score=analysis.music_snob_score,  # type: ignore[attr-defined]
-                analyzed_at=analysis.created_at,
-            )
-
+            analysis = result.first()
         except Exception as e:
             raise SpotifyAPIError(f"Failed to get analysis by share token: {e}") from e
+
+        if not analysis:
+            raise SpotifyAPIError("Analysis not found", status.HTTP_404_NOT_FOUND)
+
+        return PublicAnalysisResponse(
+            rating_text=analysis.rating_text,  # type: ignore[attr-defined]
+            rating_description=analysis.rating_description,  # type: ignore[attr-defined]
+            critical_acclaim_score=analysis.critical_acclaim_score,  # type: ignore[attr-defined]
+            music_snob_score=analysis.music_snob_score,  # type: ignore[attr-defined]
+            analyzed_at=analysis.created_at,
+        )
@@ -3,41 +3,44 @@
 import secrets
 import string
 
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
+from sqlalchemy.exc import IntegrityError
 
-from .models import MusicAnalysisResult
+# share_token is UNIQUE in the database, so a collision (1 in 10^26) surfaces
+# as an IntegrityError on write and is retried with a fresh token
+SHARE_TOKEN_ATTEMPTS = 3
 
+# Unique index on share_token; only its violations are worth retrying
+SHARE_TOKEN_CONSTRAINT = "ix_musicanalysisresult_share_token"
 
-def generate_share_token() -> str:
-    """Generate cryptographically secure 15-character share token.
-
-    Uses uppercase letters, lowercase letters, and digits (62 possibilities per character).
-    Total combinations: 62^15 = ~1.4 × 10^26 possibilities.
-    """
-    alphabet = string.ascii_letters + string.digits  # a-z, A-Z, 0-9 (62 chars)
-    return "".join(secrets.choice(alphabet) for _ in range(15))
 
+def violated_constraint(exc: IntegrityError) -> str | None:
+    """Return the name of the constraint behind an IntegrityError, if known."""
+    # SQLAlchemy's asyncpg adapter wraps the asyncpg error, which carries
+    # the constraint name, as the cause of exc.orig
+    for error in (exc.orig, getattr(exc.orig, "__cause__", None)):
+        constraint_name = getattr(error, "constraint_name", None)
+        if constraint_name:
+            return constraint_name
+    return None
 
-async def generate_unique_share_token(session: AsyncSession) -> str:
-    """Generate a unique share token that doesn't exist in the database.
 
-    While collisions are extremely unlikely (1 in 10^26), this ensures uniqueness.
-    """
-    max_attempts = 10  # Safety limit, should never be needed
+# a-z, A-Z, 0-9 (62 chars)
+SHARE_TOKEN_ALPHABET = string.ascii_letters + string.digits
+SHARE_TOKEN_LENGTH = 15
 
-    for _ in range(max_attempts):
-        token = generate_share_token()
 
-        # Check if token already exists
-        stmt = select(MusicAnalysisResult).where(
-            MusicAnalysisResult.share_token == token
-        )
-        result = await session.execute(stmt)
-        existing = result.scalar_one_or_none()
+def generate_share_token() -> str:
+    """Generate cryptographically secure 15-character share token.
 
-        if not existing:
-            return token
+    Uses uppercase letters, lowercase letters, and digits (62 possibilities per character).
+    Total combinations: 62^15 = ~1.4 × 10^26 possibilities.
 
-    # This should never happen with 62^15 possibilities
-    raise RuntimeError("Failed to generate unique share token after maximum attempts")
+    Draws a single uniform integer below 62^15 and base62-encodes it, instead of
+    one CSPRNG call per character.
+    """
+    value = secrets.randbelow(len(SHARE_TOKEN_ALPHABET) ** SHARE_TOKEN_LENGTH)
+    chars = []
+    for _ in range(SHARE_TOKEN_LENGTH):
+        value, index = divmod(value, len(SHARE_TOKEN_ALPHABET))
+        chars.append(SHARE_TOKEN_ALPHABET[index])
+    return "".join(chars)
@@ -1,16 +1,23 @@
 """Spotify API client for music data operations."""
 
 import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
 from typing import Any
 
 import httpx
-from pydantic import BaseModel
+import orjson
 
 from ..core.config import settings
 from ..core.exceptions import SpotifyAPIError
 
 
-class SpotifyTokenInfo(BaseModel):
+@dataclass(slots=True)
+class SpotifyTokenInfo:
     """Spotify token information."""
 
     access_token: str
@@ -20,38 +27,129 @@ class SpotifyTokenInfo(BaseModel):
     scope: str | None = None
 
 
+# Upper bound on ids accepted by Spotify's several-tracks/artists endpoints
+MAX_IDS_PER_REQUEST = 50
+
+
+@lru_cache(maxsize=256)
+def _auth_headers(access_token: str) -> dict[str, str]:
+    """Bearer auth headers for a token, shared across a user's fan-out requests.
+
+    The returned dict is shared and must not be mutated.
+    """
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+class RequestRateLimiter:
+    """Space out request starts to at most `rate` per second.
+
+    The rate is halved whenever the server throttles us and climbs back
+    towards the configured maximum as requests succeed (AIMD).
+    """
+
+    MIN_RATE = 0.5
+    RECOVERY_STEP = 0.1
+
+    def __init__(
+        self,
+        rate: float,
+        monotonic: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.monotonic = monotonic
+        self.sleep = sleep
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        """Wait until the next request slot is available."""
+        # No await between reading and reserving the slot, so no lock is needed
+        now = self.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            await self.sleep(slot - now)
+
+    def throttle(self) -> None:
+        """Halve the request rate after the server rate-limited us."""
+        self.rate = max(self.MIN_RATE, self.rate / 2)
+
+    def recover(self) -> None:
+        """Nudge the request rate back up after a successful request."""
+        self.rate = min(self.max_rate, self.rate + self.RECOVERY_STEP)
+
+
 class SpotifyMusicClient:
     """Spotify API client for music operations."""
 
     BASE_URL = "https://api.spotify.com/v1"
     AUTH_URL = "https://accounts.spotify.com/api/token"
 
-    def __init__(self):
+    # Client errors with a fixed message
+    ERROR_BY_STATUS = {
+        401: "Invalid or expired access token",
+        403: "Insufficient permissions",
+        404: "Resource not found",
+    }
+
+    # Full-jitter exponential backoff for network errors (seconds)
+    RETRY_BACKOFF_BASE = 0.5
+    RETRY_BACKOFF_CAP = 20.0
+
+    def __init__(self, sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
         self.settings = settings
         self.client: httpx.AsyncClient | None = None
+        self.rate_limiter = RequestRateLimiter(
+            settings.spotify_requests_per_second, sleep=sleep
+        )
+        # Retry delays go through here, so tests can swap in a fake clock
+        self.sleep = sleep
 
     async def __aenter__(self):
         """Async context manager entry."""
-        self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(30.0),
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
-        )
+        self._get_client()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self.client:
-            await self.client.aclose()
+        """Async context manager exit.
+
+        The connection pool is kept warm for later requests; it is released by
+        close() at application shutdown.
+        """
+
+    @staticmethod
+    def _build_client() -> httpx.AsyncClient:
+        """Build an HTTP/2 client; concurrent Spotify calls share multiplexed connections."""
+        return httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=10,
+                max_connections=20,
+                keepalive_expiry=60.0,
+            ),
+        )
 
     def _get_client(self) -> httpx.AsyncClient:
         """Get HTTP client, create if needed."""
         if self.client is None:
-            self.client = httpx.AsyncClient(
-                timeout=httpx.Timeout(30.0),
-                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
-            )
+            self.client = self._build_client()
         return self.client
 
+    @classmethod
+    def _backoff(cls, attempt: int) -> float:
+        """Upper bound of the exponential backoff for a retry attempt."""
+        return min(cls.RETRY_BACKOFF_CAP, cls.RETRY_BACKOFF_BASE * 2**attempt)
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float | None:
+        """Seconds the server asked us to wait before retrying, if it said."""
+        try:
+            return float(response.headers["retry-after"])
+        except (KeyError, ValueError):
+            return None  # Absent, HTTP-date or garbage; use our own backoff
+
     async def _make_request(
         self,
         method: str,
@@ -66,6 +164,7 @@ class SpotifyMusicClient:
 
         for attempt in range(retries + 1):
             try:
+                await self.rate_limiter.acquire()
                 response = await client.request(
                     method=method,
                     url=url,
@@ -74,27 +173,40 @@ class SpotifyMusicClient:
                     data=data,
                 )
 
+                if response.status_code == 429:
+                    self.rate_limiter.throttle()
+                else:
+                    self.rate_limiter.recover()
+
                 if response.status_code == 200:
-                    return response.json()
+                    return orjson.loads(response.content)
                 elif response.status_code == 204:
                     return {}
                 elif response.status_code == 429:
-                    # Rate limited - wait and retry
-                    retry_after = int(response.headers.get("retry-after", 1))
+                    # Rate limited - honour Retry-After, else back off exponentially
+                    retry_after = self._retry_after(response)
                     if attempt < retries:
-                        await asyncio.sleep(retry_after)
+                        if retry_after is None:
+                            delay = random.uniform(0, self._backoff(attempt))
+                        else:
+                            # Jitter so throttled calls don't retry in lockstep
+                            delay = retry_after + random.uniform(
+                                0, min(1.0, retry_after)
+                            )
+                        await self.sleep(delay)
                         continue
+                    if retry_after is None:
+                        raise SpotifyAPIError("Rate limit exceeded")
                     raise SpotifyAPIError(
-                        f"Rate limit exceeded. Retry after {retry_after} seconds"
+                        f"Rate limit exceeded. Retry after {retry_after:g} seconds"
                     )
-                elif response.status_code == 401:
-                    raise SpotifyAPIError("Invalid or expired access token")
-                elif response.status_code == 403:
-                    raise SpotifyAPIError("Insufficient permissions")
-                elif response.status_code == 404:
-                    raise SpotifyAPIError("Resource not found")
+                elif error_msg := self.ERROR_BY_STATUS.get(response.status_code):
+                    raise SpotifyAPIError(error_msg, response.status_code)
                 else:
-                    error_data = response.json() if response.content else {}
+                    try:
+                        error_data = orjson.loads(response.content)
+                    except orjson.JSONDecodeError:
+                        error_data = {}  # Empty or non-JSON (e.g. proxy HTML) body
                     error_msg = error_data.get("error", {}).get(
                         "message", f"HTTP {response.status_code}"
                     )
@@ -102,7 +214,8 @@ class SpotifyMusicClient:
 
             except httpx.RequestError as e:
                 if attempt < retries:
-                    await asyncio.sleep(2**attempt)  # Exponential backoff
+                    # Exponential backoff with full jitter
+                    await self.sleep(random.uniform(0, self._backoff(attempt)))
                     continue
                 raise SpotifyAPIError(f"Network error: {e}") from e
             except SpotifyAPIError:
@@ -133,11 +246,14 @@ class SpotifyMusicClient:
                 data=data,
             )
 
-            # If no new refresh token provided, keep the old one
-            if "refresh_token" not in response_data:
-                response_data["refresh_token"] = refresh_token
-
-            return SpotifyTokenInfo(**response_data)
+            return SpotifyTokenInfo(
+                access_token=response_data["access_token"],
+                # If no new refresh token provided, keep the old one
+                refresh_token=response_data.get("refresh_token", refresh_token),
+                expires_in=int(response_data["expires_in"]),
+                token_type=response_data.get("token_type", "Bearer"),
+                scope=response_data.get("scope"),
+            )
 
         except Exception as e:
             raise SpotifyAPIError(f"Failed to refresh token: {e}") from e
@@ -150,7 +266,7 @@ class SpotifyMusicClient:
         offset: int = 0,
     ) -> dict[str, Any]:
         """Get user's top tracks."""
-        headers = {"Authorization": f"Bearer {access_token}"}
+        headers = _auth_headers(access_token)
         params = {
             "time_range": time_range,
             "limit": min(limit, 50),  # Spotify max is 50
@@ -172,7 +288,7 @@ class SpotifyMusicClient:
         offset: int = 0,
     ) -> dict[str, Any]:
         """Get user's top artists."""
-        headers = {"Authorization": f"Bearer {access_token}"}
+        headers = _auth_headers(access_token)
         params = {
             "time_range": time_range,
             "limit": min(limit, 50),  # Spotify max is 50
@@ -194,7 +310,7 @@ class SpotifyMusicClient:
         before: int | None = None,
     ) -> dict[str, Any]:
         """Get user's recently played tracks."""
-        headers = {"Authorization": f"Bearer {access_token}"}
+        headers = _auth_headers(access_token)
         params = {"limit": min(limit, 50)}  # Spotify max is 50
 
         if after:
@@ -218,12 +334,9 @@ class SpotifyMusicClient:
         if not track_ids:
             return {"tracks": []}
 
-        # Spotify allows up to 50 tracks per request
-        if len(track_ids) > 50:
-            track_ids = track_ids[:50]
-
-        headers = {"Authorization": f"Bearer {access_token}"}
-        params = {"ids": ",".join(track_ids)}
+        # Spotify allows up to 50 tracks per request; islice avoids copying
+        headers = _auth_headers(access_token)
+        params = {"ids": ",".join(islice(track_ids, MAX_IDS_PER_REQUEST))}
 
         return await self._make_request(
             method="GET",
@@ -241,12 +354,9 @@ class SpotifyMusicClient:
         if not artist_ids:
             return {"artists": []}
 
-        # Spotify allows up to 50 artists per request
-        if len(artist_ids) > 50:
-            artist_ids = artist_ids[:50]
-
-        headers = {"Authorization": f"Bearer {access_token}"}
-        params = {"ids": ",".join(artist_ids)}
+        # Spotify allows up to 50 artists per request; islice avoids copying
+        headers = _auth_headers(access_token)
+        params = {"ids": ",".join(islice(artist_ids, MAX_IDS_PER_REQUEST))}
 
         return await self._make_request(
             method="GET",
@@ -257,7 +367,7 @@ class SpotifyMusicClient:
 
     async def get_current_user(self, access_token: str) -> dict[str, Any]:
         """Get current user profile."""
-        headers = {"Authorization": f"Bearer {access_token}"}
+        headers = _auth_headers(access_token)
 
         return await self._make_request(
             method="GET",
@@ -1,86 +1,144 @@
 """Spotify data collection service for music analysis."""
 
+import asyncio
+from collections.abc import Awaitable, Callable
+from functools import partial
 from typing import Any
 
+from fastapi import status
+
+from ..core.config import settings
 from ..core.exceptions import SpotifyAPIError
 from ..core.logging import get_logger, log_error_with_context
-from .spotify import spotify_music_client
+from . import spotify
 from .token_refresh_service import TokenRefreshService
 
+TIME_RANGES = ("short_term", "medium_term", "long_term")
+
+# Fields kept from Spotify items; everything else (album art, markets,
+# external URLs, ...) is dropped as soon as a response arrives
+TRACK_FIELDS = ("id", "name", "popularity")
+ARTIST_FIELDS = ("id", "name", "genres", "popularity")
+
+# Bound how many users' listening history is fetched from Spotify at once
+_fetch_semaphore = asyncio.Semaphore(settings.spotify_max_concurrent_fetches)
+
+
+def _compact_track(track: dict[str, Any]) -> dict[str, Any]:
+    """Keep only the track fields used by the analyzers."""
+    compact = {field: track[field] for field in TRACK_FIELDS if field in track}
+    if "artists" in track:
+        compact["artists"] = [
+            {"name": artist.get("name", "")} for artist in track["artists"]
+        ]
+    return compact
+
+
+def _compact_artist(artist: dict[str, Any]) -> dict[str, Any]:
+    """Keep only the artist fields used by the analyzers."""
+    return {field: artist[field] for field in ARTIST_FIELDS if field in artist}
+
+
+def _compact_recently_played(play: dict[str, Any]) -> dict[str, Any]:
+    """Keep only the play timestamp and compact track of a recently played item."""
+    return {
+        "played_at": play.get("played_at"),
+        "track": _compact_track(play.get("track") or {}),
+    }
+
 
 class SpotifyDataCollector:
     """Service for collecting music data from Spotify API."""
 
     def __init__(self, token_service: TokenRefreshService):
         self.token_service = token_service
-        self.spotify_client = spotify_music_client
+        self.spotify_client = spotify.spotify_music_client
         self.logger = get_logger(__name__)
 
-    async def fetch_user_music_data(self, user_id: int) -> dict[str, Any]:
-        """Fetch comprehensive music data from Spotify for analysis."""
+    async def fetch_user_music_data(self, user_id: int) -> tuple[dict[str, Any], bool]:
+        """Fetch comprehensive music data from Spotify for analysis.
+
+        Returns the collected data along with a flag telling whether Spotify
+        returned any listening history at all.
+        """
         try:
             access_token = await self.token_service.get_valid_access_token(user_id)
 
-            music_data = {}
+            music_data: dict[str, Any] = {}
+            request_slots = asyncio.Semaphore(settings.spotify_max_requests_per_user)
 
-            # Fetch top tracks and artists for all time ranges
-            await self._fetch_top_items(access_token, user_id, music_data)
+            async def collect(
+                key: str,
+                fetch: Callable[[], Awaitable[dict[str, Any]]],
+                compact: Callable[[dict[str, Any]], dict[str, Any]],
+                context: dict[str, Any],
+            ) -> None:
+                # A failed endpoint is logged and left empty rather than
+                # failing the whole analysis
+                try:
+                    async with request_slots:
+                        response = await fetch()
+                except Exception as e:
+                    if (
+                        isinstance(e, SpotifyAPIError)
+                        and e.status_code == status.HTTP_401_UNAUTHORIZED
+                    ):
+                        # Revoked or rotated elsewhere; reload it next time
+                        self.token_service.invalidate_access_token(user_id)
+                    log_error_with_context(self.logger, e, context, user_id)
+                    music_data[key] = {"items": []}
+                    return
+                music_data[key] = {
+                    "items": [compact(item) for item in response.get("items", ())]
+                }
 
-            # Fetch recently played tracks
-            await self._fetch_recently_played(access_token, user_id, music_data)
+            async with _fetch_semaphore, asyncio.TaskGroup() as tg:
+                for time_range in TIME_RANGES:
+                    tg.create_task(
+                        collect(
+                            f"top_tracks_{time_range}",
+                            partial(
+                                self.spotify_client.get_user_top_tracks,
+                                access_token,
+                                time_range,
+                                limit=50,
+                            ),
+                            _compact_track,
+                            {"time_range": time_range, "endpoint": "top_tracks"},
+                        )
+                    )
+                    tg.create_task(
+                        collect(
+                            f"top_artists_{time_range}",
+                            partial(
+                                self.spotify_client.get_user_top_artists,
+                                access_token,
+                                time_range,
+                                limit=50,
+                            ),
+                            _compact_artist,
+                            {"time_range": time_range, "endpoint": "top_artists"},
+                        )
+                    )
+                tg.create_task(
+                    collect(
+                        "recently_played",
+                        partial(
+                            self.spotify_client.get_recently_played,
+                            access_token,
+                            limit=50,
+                        ),
+                        _compact_recently_played,
+                        {"endpoint": "recently_played"},
+                    )
+                )
 
-            return music_data
+            has_data = any(
+                music_data[f"top_tracks_{time_range}"].get("items")
+                for time_range in TIME_RANGES
+            ) or bool(music_data["recently_played"].get("items"))
 
-        except Exception as e:
-            raise SpotifyAPIError(f"Failed to fetch music data: {e}") from e
-
-    async def _fetch_top_items(
-        self, access_token: str, user_id: int, music_data: dict[str, Any]
-    ) -> None:
-        """Fetch top tracks and artists for all time ranges."""
-        for time_range in ["short_term", "medium_term", "long_term"]:
-            # Fetch top tracks
-            try:
-                music_data[
-                    f"top_tracks_{time_range}"
-                ] = await self.spotify_client.get_user_top_tracks(
-                    access_token, time_range, limit=50
-                )
-            except Exception as e:
-                log_error_with_context(
-                    self.logger,
-                    e,
-                    {"time_range": time_range, "endpoint": "top_tracks"},
-                    user_id,
-                )
-                music_data[f"top_tracks_{time_range}"] = {"items": []}
-
-            # Fetch top artists
-            try:
-                music_data[
-                    f"top_artists_{time_range}"
-                ] = await self.spotify_client.get_user_top_artists(
-                    access_token, time_range, limit=50
-                )
-            except Exception as e:
-                log_error_with_context(
-                    self.logger,
-                    e,
-                    {"time_range": time_range, "endpoint": "top_artists"},
-                    user_id,
-                )
-                music_data[f"top_artists_{time_range}"] = {"items": []}
+            return music_data, has_data
 
-    async def _fetch_recently_played(
-        self, access_token: str, user_id: int, music_data: dict[str, Any]
-    ) -> None:
-        """Fetch recently played tracks."""
-        try:
-            music_data[
-                "recently_played"
-            ] = await self.spotify_client.get_recently_played(access_token, limit=50)
         except Exception as e:
-            log_error_with_context(
-                self.logger, e, {"endpoint": "recently_played"}, user_id
-            )
-            music_data["recently_played"] = {"items": []}
+            raise SpotifyAPIError(f"Failed to fetch music data: {e}") from e
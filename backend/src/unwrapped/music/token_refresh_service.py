@@ -1,13 +1,30 @@
 """Token refresh service for managing Spotify authentication tokens."""
 
+import asyncio
+from collections import defaultdict
 from datetime import UTC, datetime, timedelta
 
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
 
+from ..auth.models import User
 from ..auth.service import UserService
+from ..auth.token_cache import cache_token, get_cached_token, invalidate_cached_token
 from ..core.exceptions import SpotifyAPIError
 from ..core.logging import get_logger
-from .spotify import spotify_music_client
+from . import spotify
+
+# Tokens are refreshed once they are within this margin of expiring
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+# One lock per user so concurrent refreshes collapse into a single Spotify call;
+# entries are dropped once their refresh finishes
+_refresh_locks: defaultdict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+def _get_cached_token(user_id: int) -> str | None:
+    """Return the cached access token if it is outside the refresh margin."""
+    return get_cached_token(user_id, datetime.now(UTC) + TOKEN_REFRESH_MARGIN)
 
 
 class TokenRefreshService:
@@ -15,13 +32,17 @@ class TokenRefreshService:
 
     def __init__(self, session: AsyncSession):
         self.session = session
-        self.spotify_client = spotify_music_client
+        self.user_service = UserService(session)
+        self.spotify_client = spotify.spotify_music_client
         self.logger = get_logger(__name__)
 
     async def get_valid_access_token(self, user_id: int) -> str:
         """Get valid access token, refreshing if necessary."""
-        user_service = UserService(self.session)
-        user = await user_service.get_user_by_id(user_id)
+        cached_token = _get_cached_token(user_id)
+        if cached_token:
+            return cached_token
+
+        user = await self.user_service.get_user_by_id(user_id)
         if not user:
             raise SpotifyAPIError(f"User {user_id} not found")
 
@@ -30,48 +51,90 @@ class TokenRefreshService:
 
         # Check if token expires soon (within 5 minutes)
         if user.token_expires_at:
-            expires_soon = datetime.now(UTC) + timedelta(minutes=5)
+            expires_soon = datetime.now(UTC) + TOKEN_REFRESH_MARGIN
             if user.token_expires_at <= expires_soon:
-                # Token expired or expires soon, refresh it
-                if not user.refresh_token:
-                    raise SpotifyAPIError("Spotify refresh token not available")
-
+                # Token expired or expires soon, refresh it. Concurrent callers
+                # queue on the lock and pick up the token the first one fetched
+                lock = _refresh_locks[user_id]
                 try:
-                    # Refresh the token
-                    token_info = await self.spotify_client.refresh_access_token(
-                        user.refresh_token
-                    )
-
-                    # Update user with new token info
-                    user.access_token = token_info.access_token
-                    user.refresh_token = token_info.refresh_token
-                    user.token_expires_at = datetime.now(UTC) + timedelta(
-                        seconds=token_info.expires_in
-                    )
-
-                    # Save updated user
-                    self.session.add(user)
-                    await self.session.commit()
-                    await self.session.refresh(user)
-
-                    self.logger.info(
-                        "Successfully refreshed Spotify token",
-                        extra={"user_id": user_id},
-                    )
-
-                    return token_info.access_token
-
-                except Exception as e:
-                    raise SpotifyAPIError(
-                        f"Failed to refresh Spotify token: {e}"
-                    ) from e
+                    async with lock:
+                        cached_token = _get_cached_token(user_id)
+                        if cached_token:
+                            return cached_token
+                        return await self._refresh_access_token(user)
+                finally:
+                    # A caller arriving after the eviction gets a new lock; the
+                    # row lock in _refresh_access_token still keeps it from
+                    # refreshing a second time
+                    if not lock.locked() and _refresh_locks.get(user_id) is lock:
+                        del _refresh_locks[user_id]
+
+            cache_token(user_id, user.access_token, user.token_expires_at)
 
         return user.access_token
 
+    async def _refresh_access_token(self, user: User) -> str:
+        """Refresh the user's access token with Spotify and store it."""
+        # Lock the row so workers in other processes cannot refresh at the same
+        # time; one of them may already have done so while we waited
+        result = await self.session.execute(
+            select(User)
+            .where(User.id == user.id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        user = result.scalar_one()
+        if (
+            user.access_token
+            and user.token_expires_at
+            and user.token_expires_at > datetime.now(UTC) + TOKEN_REFRESH_MARGIN
+        ):
+            cache_token(user.id, user.access_token, user.token_expires_at)
+            await self.session.commit()  # Release the row lock
+            return user.access_token
+
+        if not user.refresh_token:
+            await self.session.rollback()  # Release the row lock
+            raise SpotifyAPIError("Spotify refresh token not available")
+
+        try:
+            # Refresh the token
+            token_info = await self.spotify_client.refresh_access_token(
+                user.refresh_token
+            )
+
+            # Update user with new token info
+            user.access_token = token_info.access_token
+            user.refresh_token = token_info.refresh_token
+            user.token_expires_at = datetime.now(UTC) + timedelta(
+                seconds=token_info.expires_in
+            )
+
+            # Save updated user
+            self.session.add(user)
+            await self.session.commit()
+            await self.session.refresh(user)
+
+            cache_token(user.id, token_info.access_token, user.token_expires_at)
+
+            self.logger.info(
+                "Successfully refreshed Spotify token",
+                extra={"user_id": user.id},
+            )
+
+            return token_info.access_token
+
+        except Exception as e:
+            await self.session.rollback()  # Release the row lock
+            raise SpotifyAPIError(f"Failed to refresh Spotify token: {e}") from e
+
+    def invalidate_access_token(self, user_id: int) -> None:
+        """Drop the user's cached token after Spotify rejected it."""
+        invalidate_cached_token(user_id)
+
     async def is_token_valid(self, user_id: int) -> bool:
         """Check if user's token is valid without refreshing."""
-        user_service = UserService(self.session)
-        user = await user_service.get_user_by_id(user_id)
+        user = await self.user_service.get_user_by_id(user_id)
 
         if not user or not user.access_token:
             return False
@@ -79,6 +142,6 @@ class TokenRefreshService:
         if not user.token_expires_at:
             return True  # Assume valid if no expiration info
 
-        # Check if token expires within 5 minutes
-        expires_soon = datetime.now(UTC) + timedelta(minutes=5)
+        # Check if token expires within the refresh margin
+        expires_soon = datetime.now(UTC) + TOKEN_REFRESH_MARGIN
         return user.token_expires_at > expires_soon
@@ -1,87 +1,277 @@
 """Test configuration and fixtures."""
 
 import asyncio
-import re
+import os
 from collections.abc import AsyncGenerator
 from collections.abc import AsyncGenerator as AsyncGen
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from itertools import chain
+from types import MappingProxyType
 from unittest.mock import AsyncMock, Mock
 
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from pytest_asyncio import is_async_test
+from sqlalchemy import Table, event, insert, make_url, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
 from sqlmodel import SQLModel
 from testcontainers.postgres import PostgresContainer
 
 # Import all models to register them with SQLModel.metadata
 import src.unwrapped.auth.models  # noqa: F401
 import src.unwrapped.music.models  # noqa: F401
-from src.unwrapped.auth.models import User, UserCreate
-from src.unwrapped.core.database import get_session
-from src.unwrapped.core.security import create_user_token
+from src.unwrapped.auth.models import User
+from src.unwrapped.auth.token_cache import (
+    clear_token_cache as clear_token_cache_entries,
+)
+from src.unwrapped.core.database import get_session, get_session_maker
+from src.unwrapped.core.security import create_access_token
 from src.unwrapped.main import app
-from tests.utils.atlas import apply_atlas_migrations, check_atlas_available
+from src.unwrapped.music import spotify
+from src.unwrapped.music.analysis_events import (
+    AnalysisEventListener,
+    get_analysis_event_listener,
+)
+from tests.utils.atlas import (
+    apply_atlas_migrations,
+    check_atlas_available,
+    migrations_checksum,
+)
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test in the session-wide event loop.
+
+    Session-scoped async fixtures (engine, connection) live in that loop, so
+    tests must share it rather than get a fresh loop each. Tests marked
+    ``no_db`` must not pull in the database session.
+    """
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+        if item.get_closest_marker("no_db") and "async_session" in getattr(
+            item, "fixturenames", ()
+        ):
+            raise pytest.UsageError(
+                f"{item.nodeid} is marked no_db but uses the database session"
+            )
 
 
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
+def event_loop_policy():
+    """Run the test event loop on uvloop where available.
+
+    uvloop comes with uvicorn[standard] on every platform it supports and
+    makes the many short asyncpg round trips noticeably cheaper.
+    """
     try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
+
+
+# Started once collection shows a test needs it, in the background so the boot
+# overlaps with the first tests
+_postgres_container: Future[PostgresContainer] | None = None
+
+
+def start_postgres_container() -> PostgresContainer:
+    """Start a throwaway Postgres server tuned for tests."""
+    # Keep data in memory and skip durability work
+    container = (
+        PostgresContainer("postgres:15-alpine")
+        .with_command(
+            "postgres -c fsync=off -c synchronous_commit=off"
+            " -c full_page_writes=off -c max_connections=50"
+            " -c shared_buffers=128MB"
+        )
+        .with_kwargs(tmpfs={"/var/lib/postgresql/data": "rw,size=256m"})
+    )
+    return container.start()
 
 
-@pytest_asyncio.fixture(scope="session")
-async def postgres_container():
-    """Create a PostgreSQL test container for the session with Atlas migrations applied."""
-    with PostgresContainer("postgres:15") as postgres:
-        # Get the standard connection URL for Atlas
-        postgres_url = postgres.get_connection_url()
-
-        # Check if Atlas is available and try to apply migrations
-        atlas_applied = False
-        if check_atlas_available():
+def pytest_collection_finish(session):
+    """Warm up the test database server if any selected test needs it.
+
+    Runs after ``-m``/``-k`` deselection, so ``no_db`` and unit-only runs
+    never start Docker. The xdist controller does not collect; each worker
+    starts its own server.
+    """
+    global _postgres_container
+    if os.environ.get("TEST_DATABASE_URL"):
+        return
+    if not any(
+        "postgres_url" in getattr(item, "fixturenames", ()) for item in session.items
+    ):
+        return
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    _postgres_container = executor.submit(start_postgres_container)
+    executor.shutdown(wait=False)
+
+
+def pytest_unconfigure(config):
+    """Stop the container started at collection, if it came up."""
+    if _postgres_container is not None and _postgres_container.exception() is None:
+        _postgres_container.result().stop()
+
+
+# Migrated once and cloned per session by CREATE DATABASE ... TEMPLATE; its
+# comment holds the migrations checksum it was built from
+TEMPLATE_DATABASE = "template_test"
+
+# Arbitrary advisory lock key serialising template builds across xdist workers
+TEMPLATE_LOCK_ID = 7431001
+
+
+def asyncpg_url(postgres_url: str) -> str:
+    """Swap whatever scheme/driver the URL has for postgresql+asyncpg://."""
+    _, _, location = postgres_url.partition("://")
+    return f"postgresql+asyncpg://{location}"
+
+
+def with_database(postgres_url: str, name: str) -> str:
+    """Point a server URL at another database on the same server."""
+    url = make_url(postgres_url).set(database=name)
+    return url.render_as_string(hide_password=False)
+
+
+def apply_migrations(postgres_url: str) -> bool:
+    """Apply Atlas migrations to a database.
+
+    Returns whether Atlas was applied; if not, tables are created from
+    SQLModel.metadata instead.
+    """
+    if not check_atlas_available():
+        print("Warning: Atlas CLI not available, will use SQLModel.metadata.create_all")
+        return False
+
+    try:
+        apply_atlas_migrations(postgres_url)
+    except RuntimeError as e:
+        # If Atlas migration fails, we'll fall back to SQLModel
+        print(f"Warning: Atlas migration failed, will use SQLModel fallback: {e}")
+        return False
+
+    print("Atlas migrations applied successfully to test database")
+    return True
+
+
+async def migrate_database(postgres_url: str) -> None:
+    """Bring a database's schema up to date."""
+    if apply_migrations(postgres_url):
+        return
+
+    # Only create tables if Atlas migrations weren't applied successfully
+    print("Creating tables using SQLModel.metadata.create_all")
+    engine = create_async_engine(asyncpg_url(postgres_url))
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+    finally:
+        await engine.dispose()
+
+
+async def build_template_database(conn: AsyncConnection, server_url: str) -> None:
+    """Build the migrated template database unless it is already current."""
+    checksum = migrations_checksum()
+    template = (
+        await conn.execute(
+            text(
+                "SELECT shobj_description(oid, 'pg_database') FROM pg_database"
+                " WHERE datname = :name"
+            ),
+            {"name": TEMPLATE_DATABASE},
+        )
+    ).first()
+    if template is not None and template[0] == checksum:
+        return
+
+    if template is not None:
+        await conn.execute(
+            text(f'ALTER DATABASE "{TEMPLATE_DATABASE}" IS_TEMPLATE false')
+        )
+        await conn.execute(text(f'DROP DATABASE "{TEMPLATE_DATABASE}"'))
+    await conn.execute(text(f'CREATE DATABASE "{TEMPLATE_DATABASE}"'))
+    await migrate_database(with_database(server_url, TEMPLATE_DATABASE))
+    await conn.execute(text(f'ALTER DATABASE "{TEMPLATE_DATABASE}" IS_TEMPLATE true'))
+    # The checksum is hex, so it is safe to inline
+    await conn.execute(
+        text(f"COMMENT ON DATABASE \"{TEMPLATE_DATABASE}\" IS '{checksum}'")
+    )
+
+
+async def create_test_database(server_url: str, name: str) -> str:
+    """Recreate a test database from the migrated template and return its URL.
+
+    The template survives across runs on a reused server and is only rebuilt
+    when the migrations change, so each session starts from a fresh, fully
+    migrated schema in the time it takes Postgres to copy it.
+    """
+    admin_engine = create_async_engine(
+        asyncpg_url(server_url), isolation_level="AUTOCOMMIT"
+    )
+    try:
+        async with admin_engine.connect() as conn:
+            await conn.execute(
+                text("SELECT pg_advisory_lock(:key)"), {"key": TEMPLATE_LOCK_ID}
+            )
             try:
-                # Apply Atlas migrations to the test database
-                apply_atlas_migrations(postgres_url)
-                atlas_applied = True
-                print("Atlas migrations applied successfully to test database")
-            except RuntimeError as e:
-                # If Atlas migration fails, we'll fall back to SQLModel fallback: {e}")
-                print(
-                    f"Warning: Atlas migration failed, will use SQLModel fallback: {e}"
+                await build_template_database(conn, server_url)
+                await conn.execute(
+                    text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
                 )
-        else:
-            print(
-                "Warning: Atlas CLI not available, will use SQLModel.metadata.create_all"
-            )
+                await conn.execute(
+                    text(f'CREATE DATABASE "{name}" TEMPLATE "{TEMPLATE_DATABASE}"')
+                )
+            finally:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": TEMPLATE_LOCK_ID}
+                )
+    finally:
+        await admin_engine.dispose()
 
-        # Store whether Atlas was applied for use in async_engine fixture
-        postgres._atlas_applied = atlas_applied
-        yield postgres
+    return with_database(server_url, name)
 
 
 @pytest_asyncio.fixture(scope="session")
-async def async_engine(postgres_container):
-    """Create async test database engine with session scope using asyncpg."""
-    # Get the standard connection URL and convert to asyncpg format
-    postgres_url = postgres_container.get_connection_url()
+async def postgres_url():
+    """URL of a fully migrated PostgreSQL database for the test session.
 
-    # Replace postgres[ql][+driver]:// with postgresql+asyncpg:// for asyncpg driver
-    database_url = re.sub(
-        r"postgres(?:ql)?(?:\+\w+)?://", "postgresql+asyncpg://", postgres_url
-    )
+    Set TEST_DATABASE_URL to reuse an already-running Postgres server across
+    pytest runs instead of starting a fresh container each time. Each session
+    (each worker, under pytest-xdist) then gets its own database on that
+    server, cloned from a migrated template.
+    """
+    if server_url := os.environ.get("TEST_DATABASE_URL"):
+        worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        yield await create_test_database(server_url, f"test_{worker}")
+        return
 
-    engine = create_async_engine(database_url, echo=False)
+    # Throwaway database. Each xdist worker runs this fixture in its own
+    # process, so gets its own server
+    if _postgres_container is None:
+        raise RuntimeError("Postgres test container was not started")
+    container = await asyncio.wrap_future(_postgres_container)
+    container_url = container.get_connection_url()
+    await migrate_database(container_url)
+    yield container_url
 
-    # Only create tables if Atlas migrations weren't applied successfully
-    if not getattr(postgres_container, "_atlas_applied", False):
-        print("Creating tables using SQLModel.metadata.create_all")
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+
+@pytest_asyncio.fixture(scope="session")
+async def async_engine(postgres_url):
+    """Create async test database engine with session scope using asyncpg."""
+    # JIT compilation only slows down the short queries tests issue
+    engine = create_async_engine(
+        asyncpg_url(postgres_url),
+        echo=False,
+        connect_args={"server_settings": {"jit": "off"}},
+    )
 
     yield engine
 
@@ -89,52 +279,257 @@ async def async_engine(postgres_container):
     await engine.dispose()
 
 
+@pytest_asyncio.fixture(scope="session")
+async def db_connection(async_engine) -> AsyncGenerator[AsyncConnection, None]:
+    """Hold one database connection open for the whole test session."""
+    async with async_engine.connect() as connection:
+        yield connection
+
+
+@pytest_asyncio.fixture(scope="session")
+async def analysis_event_listener(
+    async_engine,
+) -> AsyncGen[AnalysisEventListener, None]:
+    """Process-wide analysis event listener, on the test database.
+
+    It listens on its own connection, so rows it should see must be committed.
+    """
+    listener = AnalysisEventListener(async_engine)
+    yield listener
+    await listener.close()
+
+
 @pytest_asyncio.fixture
-async def async_session(async_engine) -> AsyncGenerator[AsyncSession, None]:
-    """Create a new async session for each test with proper transaction rollback.
+async def async_session(db_connection) -> AsyncGenerator[AsyncSession, None]:
+    """Create a new async session for each test, truncating what it wrote.
 
-    This implements the SQLAlchemy joining session pattern for test isolation:
-    https://docs.sqlalchemy.org/en/20/orm/session_transaction.html#joining-a-session-into-an-external-transaction-such-as-for-test-suites
+    Tests commit for real on the shared connection; afterwards only the
+    tables the test wrote to are truncated, so read-only tests cost nothing.
+    """
+    session = AsyncSession(bind=db_connection)
+    dirty_tables: set[Table] = session.info.setdefault("dirty_tables", set())
+
+    def record_flush(sync_session, flush_context) -> None:
+        for obj in chain(sync_session.new, sync_session.dirty, sync_session.deleted):
+            dirty_tables.add(obj.__table__)
+
+    def record_dml(orm_execute_state) -> None:
+        if (
+            orm_execute_state.is_insert
+            or orm_execute_state.is_update
+            or orm_execute_state.is_delete
+        ):
+            dirty_tables.add(orm_execute_state.statement.table)
+
+    event.listen(session.sync_session, "after_flush", record_flush)
+    event.listen(session.sync_session, "do_orm_execute", record_dml)
+
+    try:
+        yield session
+    finally:
+        await session.close()
+        if dirty_tables:
+            preparer = db_connection.dialect.identifier_preparer
+            tables = ", ".join(preparer.format_table(t) for t in dirty_tables)
+            await db_connection.execute(
+                text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+            )
+            await db_connection.commit()
+
+
+@pytest.fixture
+def bulk_insert(async_session):
+    """Seed many rows at once through asyncpg's COPY protocol.
+
+    Usage: ``await bulk_insert(User, [{"spotify_id": ..., ...}, ...])``. Rows
+    bypass the ORM, so every NOT NULL column without a server default must be
+    given explicitly.
     """
-    async with async_engine.connect() as connection:
-        # Begin an external transaction
-        trans = await connection.begin()
 
-        # Create session bound to this connection with savepoint mode
-        session = AsyncSession(
-            bind=connection, join_transaction_mode="create_savepoint"
+    async def insert_rows(model: type[SQLModel], rows: list[dict]) -> None:
+        if not rows:
+            return
+        table = model.__table__
+        columns = list(rows[0])
+        connection = await async_session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            table.name,
+            records=[tuple(row[column] for column in columns) for row in rows],
+            columns=columns,
         )
+        async_session.info["dirty_tables"].add(table)
 
-        try:
-            yield session
-        finally:
-            await session.close()
-            # Rollback the external transaction - this undoes all changes
-            await trans.rollback()
+    return insert_rows
 
 
-@pytest_asyncio.fixture
-async def client(async_session) -> AsyncGen[AsyncClient, None]:
-    """Create async test client with database override that uses the same session."""
+@pytest.fixture
+def insert_row(async_session):
+    """Store a model instance with one INSERT ... RETURNING and return the row.
 
-    def override_get_session():
-        """Override to yield the same session used in tests."""
-        yield async_session
+    Usage: ``analysis = await insert_row(MusicAnalysisResult(...))``. The row
+    is left uncommitted; commit when another connection must see it.
+    """
 
-    app.dependency_overrides[get_session] = override_get_session
+    async def insert_model(model: SQLModel) -> SQLModel:
+        model_type = type(model)
+        result = await async_session.execute(
+            insert(model_type)
+            .values(model.model_dump(exclude={"id"}))
+            .returning(model_type)
+        )
+        return result.scalar_one()
+
+    return insert_model
 
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """Keep cached Spotify tokens from leaking between tests.
+
+    Tables are truncated with RESTART IDENTITY, so user ids repeat across
+    tests and a stale entry would be served to the next test's user.
+    """
+    clear_token_cache_entries()
+    yield
+    clear_token_cache_entries()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def http_client() -> AsyncGen[AsyncClient, None]:
+    """One ASGI test client for the whole session, with no database override.
+
+    Tests marked ``no_db`` (auth failures, static endpoints) use this directly;
+    everything else uses `client`, which routes the app onto the test session.
+    """
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url="http://test"
     ) as client:
         yield client
 
-    # Clean up dependency overrides
-    app.dependency_overrides.clear()
 
+@pytest_asyncio.fixture
+async def client(
+    http_client, async_session, analysis_event_listener
+) -> AsyncGen[AsyncClient, None]:
+    """Create async test client with database override that uses the same session."""
 
-@pytest.fixture
-def mock_spotify_client():
-    """Mock Spotify client for testing."""
+    def override_get_session():
+        """Override to yield the same session used in tests."""
+        yield async_session
+
+    @asynccontextmanager
+    async def test_session_maker():
+        """Hand background tasks the same session instead of a new one."""
+        yield async_session
+
+    # Snapshot and restore rather than clear so unrelated overrides survive
+    previous = app.dependency_overrides.copy()
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_session_maker] = lambda: test_session_maker
+    app.dependency_overrides[get_analysis_event_listener] = lambda: (
+        analysis_event_listener
+    )
+    try:
+        yield http_client
+    finally:
+        http_client.cookies.clear()
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+
+
+# Canned Spotify API responses, built once at import; the collector copies what
+# it keeps, so tests share these rather than rebuilding them per fixture call
+SPOTIFY_CURRENT_USER = {
+    "id": "test_spotify_id",
+    "display_name": "Test User",
+    "email": "test@example.com",
+    "country": "US",
+    "images": [{"url": "https://example.com/image.jpg"}],
+}
+
+SPOTIFY_TOP_TRACKS = {
+    "items": [
+        {
+            "id": "track1",
+            "name": "Test Track",
+            "artists": [{"name": "Test Artist"}],
+            "album": {"name": "Test Album"},
+            "duration_ms": 180000,
+            "explicit": False,
+            "popularity": 75,
+            "preview_url": "https://example.com/preview.mp3",
+        }
+    ]
+}
+
+SPOTIFY_TOP_ARTISTS = {
+    "items": [
+        {
+            "id": "artist1",
+            "name": "Test Artist",
+            "genres": ["pop", "rock"],
+            "popularity": 85,
+            "followers": {"total": 1000000},
+            "images": [{"url": "https://example.com/artist.jpg"}],
+        }
+    ]
+}
+
+SPOTIFY_RECENTLY_PLAYED = {
+    "items": [
+        {
+            "track": {
+                "id": "recent1",
+                "name": "Recent Track",
+                "artists": [{"name": "Recent Artist"}],
+                "album": {"name": "Recent Album"},
+                "duration_ms": 190000,
+                "explicit": False,
+                "popularity": 70,
+                "preview_url": "https://example.com/recent.mp3",
+            },
+            "played_at": "2024-01-15T10:30:00Z",
+        }
+    ]
+}
+
+SPOTIFY_TRACK_DETAILS = {
+    "tracks": [
+        {
+            "id": "track1",
+            "name": "Test Track",
+            "artists": [{"id": "artist1", "name": "Test Artist"}],
+            "album": {
+                "id": "album1",
+                "name": "Test Album",
+                "artists": [{"id": "artist1", "name": "Test Artist"}],
+            },
+            "duration_ms": 180000,
+            "explicit": False,
+            "popularity": 75,
+            "preview_url": "https://example.com/preview.mp3",
+        }
+    ]
+}
+
+SPOTIFY_ARTIST_DETAILS = {
+    "artists": [
+        {
+            "id": "artist1",
+            "name": "Test Artist",
+            "genres": ["pop", "rock"],
+            "popularity": 85,
+            "followers": {"total": 1000000},
+            "images": [{"url": "https://example.com/artist.jpg"}],
+        }
+    ]
+}
+
+
+@pytest.fixture(scope="session")
+def shared_spotify_client_mock():
+    """Mock Spotify client built once per session; use mock_spotify_client."""
     mock = AsyncMock()
     mock.get_auth_url.return_value = (
         "https://accounts.spotify.com/authorize?client_id=test"
@@ -149,116 +544,67 @@ def mock_spotify_client():
         refresh_token="new_refresh_token",
         expires_in=3600,
     )
-    mock.get_current_user.return_value = {
-        "id": "test_spotify_id",
-        "display_name": "Test User",
-        "email": "test@example.com",
-        "country": "US",
-        "images": [{"url": "https://example.com/image.jpg"}],
-    }
+    mock.get_current_user.return_value = SPOTIFY_CURRENT_USER
     # Enhanced mock methods for music testing with async support
-    mock.get_user_top_tracks.return_value = {
-        "items": [
-            {
-                "id": "track1",
-                "name": "Test Track",
-                "artists": [{"name": "Test Artist"}],
-                "album": {"name": "Test Album"},
-                "duration_ms": 180000,
-                "explicit": False,
-                "popularity": 75,
-                "preview_url": "https://example.com/preview.mp3",
-            }
-        ]
-    }
-    mock.get_user_top_artists.return_value = {
-        "items": [
-            {
-                "id": "artist1",
-                "name": "Test Artist",
-                "genres": ["pop", "rock"],
-                "popularity": 85,
-                "followers": {"total": 1000000},
-                "images": [{"url": "https://example.com/artist.jpg"}],
-            }
-        ]
-    }
-    mock.get_recently_played.return_value = {
-        "items": [
-            {
-                "track": {
-                    "id": "recent1",
-                    "name": "Recent Track",
-                    "artists": [{"name": "Recent Artist"}],
-                    "album": {"name": "Recent Album"},
-                    "duration_ms": 190000,
-                    "explicit": False,
-                    "popularity": 70,
-                    "preview_url": "https://example.com/recent.mp3",
-                },
-                "played_at": "2024-01-15T10:30:00Z",
-            }
-        ]
-    }
+    mock.get_user_top_tracks.return_value = SPOTIFY_TOP_TRACKS
+    mock.get_user_top_artists.return_value = SPOTIFY_TOP_ARTISTS
+    mock.get_recently_played.return_value = SPOTIFY_RECENTLY_PLAYED
 
-    mock.get_track_details.return_value = {
-        "tracks": [
-            {
-                "id": "track1",
-                "name": "Test Track",
-                "artists": [{"id": "artist1", "name": "Test Artist"}],
-                "album": {
-                    "id": "album1",
-                    "name": "Test Album",
-                    "artists": [{"id": "artist1", "name": "Test Artist"}],
-                },
-                "duration_ms": 180000,
-                "explicit": False,
-                "popularity": 75,
-                "preview_url": "https://example.com/preview.mp3",
-            }
-        ]
-    }
-    mock.get_artist_details.return_value = {
-        "artists": [
-            {
-                "id": "artist1",
-                "name": "Test Artist",
-                "genres": ["pop", "rock"],
-                "popularity": 85,
-                "followers": {"total": 1000000},
-                "images": [{"url": "https://example.com/artist.jpg"}],
-            }
-        ]
-    }
+    mock.get_track_details.return_value = SPOTIFY_TRACK_DETAILS
+    mock.get_artist_details.return_value = SPOTIFY_ARTIST_DETAILS
     return mock
 
 
 @pytest.fixture
-def sample_user_data():
-    """Sample user data for testing."""
-    return {
+def mock_spotify_client(shared_spotify_client_mock):
+    """Mock Spotify client for testing.
+
+    The session-wide mock is reset after each test, clearing recorded calls and
+    any side effects a test installed while keeping the canned return values.
+    """
+    yield shared_spotify_client_mock
+    shared_spotify_client_mock.reset_mock(side_effect=True)
+
+
+@pytest.fixture
+def patched_spotify_client(monkeypatch, mock_spotify_client):
+    """Install the mock Spotify client in place of the shared singleton."""
+    monkeypatch.setattr(spotify, "spotify_music_client", mock_spotify_client)
+    return mock_spotify_client
+
+
+# Read-only, so a single instance can be shared by every test
+SAMPLE_USER_DATA = MappingProxyType(
+    {
         "spotify_id": "test_spotify_id",
         "email": "test@example.com",
         "display_name": "Test User",
         "country": "US",
         "image_url": "https://example.com/image.jpg",
     }
+)
+
+
+@pytest.fixture(scope="session")
+def sample_user_data():
+    """Sample user data for testing."""
+    return SAMPLE_USER_DATA
 
 
 @pytest_asyncio.fixture
-async def test_user(async_session: AsyncSession, sample_user_data) -> User:
+async def test_user(insert_row, sample_user_data) -> User:
     """Create a test user in the database."""
-    user_create = UserCreate(**sample_user_data)
-    user = User(**user_create.model_dump())
-    user.access_token = "test_access_token"
-    user.refresh_token = "test_refresh_token"
-
-    async_session.add(user)
-    await async_session.commit()
-    await async_session.refresh(user)
+    # The sample data is a trusted literal, so skip Pydantic validation; this
+    # still fills in field defaults such as the timestamps
+    user = User.model_construct(
+        **sample_user_data,
+        access_token="test_access_token",
+        refresh_token="test_refresh_token",
+    )
 
-    return user
+    # Left uncommitted: the app shares this session, and committing would
+    # expire the instance and force a reload on next access
+    return await insert_row(user)
 
 
 @pytest.fixture
@@ -275,7 +621,27 @@ def mock_settings():
     )
 
 
+@pytest.fixture(scope="session")
+def user_tokens() -> dict[int, str]:
+    """JWTs signed so far this session, by user id."""
+    return {}
+
+
+@pytest.fixture
+def valid_jwt_token(test_user, user_tokens):
+    """Create a valid JWT token for testing authenticated endpoints.
+
+    Truncation restarts identities, so test_user nearly always gets the same
+    id; its token is signed once per session, valid long enough to outlive it.
+    """
+    if test_user.id not in user_tokens:
+        user_tokens[test_user.id] = create_access_token(
+            data={"sub": str(test_user.id)}, expires_delta=timedelta(hours=24)
+        )
+    return user_tokens[test_user.id]
+
+
 @pytest.fixture
-def valid_jwt_token(test_user):
-    """Create a valid JWT token for testing authenticated endpoints."""
-    return create_user_token(test_user.id)
+def auth_headers(valid_jwt_token):
+    """Authorization headers carrying the test user's JWT."""
+    return {"Authorization": f"Bearer {valid_jwt_token}"}
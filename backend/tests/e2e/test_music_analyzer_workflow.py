@@ -1,367 +1,296 @@
 """End-to-end tests for the complete music analyzer workflow."""
 
 import asyncio
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
 from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.unwrapped.auth.models import User
-from src.unwrapped.music.models import AnalysisStatus
+from src.unwrapped.core.security import create_user_token
+from src.unwrapped.music import analysis_service, background_tasks
+from src.unwrapped.music.models import AnalysisStatus, MusicAnalysisResult
+from tests.utils.fakes import FakeMusicAnalysisAI
+
+
+@pytest.fixture
+def fake_ai_client(
+    monkeypatch, patched_spotify_client: AsyncMock
+) -> FakeMusicAnalysisAI:
+    """Point the background task's Spotify and AI clients at fakes.
+
+    Returns the fake AI client; tests set its result or error.
+    """
+    mock_ai = FakeMusicAnalysisAI()
+    monkeypatch.setattr(background_tasks, "music_analysis_ai", mock_ai)
+    return mock_ai
+
+
+@pytest.fixture
+def wait_for_analysis(monkeypatch) -> Callable[[int, float], Awaitable[None]]:
+    """Signal when the analysis tasks begin schedules finish.
+
+    Returns ``wait(analysis_id, timeout)``, which lets tests await an analysis
+    instead of polling its status; it raises TimeoutError if the task does
+    not finish in time.
+    """
+    done: defaultdict[int, asyncio.Event] = defaultdict(asyncio.Event)
+    process_task = analysis_service.process_music_analysis_task
+
+    async def process_and_signal(analysis_id: int, *args, **kwargs) -> None:
+        try:
+            await process_task(analysis_id, *args, **kwargs)
+        finally:
+            done[analysis_id].set()
+
+    monkeypatch.setattr(
+        analysis_service, "process_music_analysis_task", process_and_signal
+    )
+
+    async def wait(analysis_id: int, timeout: float) -> None:
+        await asyncio.wait_for(done[analysis_id].wait(), timeout)
+
+    return wait
+
+
+@pytest.fixture
+def skip_analysis_task(monkeypatch) -> None:
+    """Stop begin from running the analysis pipeline, for tests of begin alone."""
+
+    async def noop(*args, **kwargs) -> None:
+        return None
+
+    monkeypatch.setattr(analysis_service, "process_music_analysis_task", noop)
 
 
 class TestMusicAnalyzerWorkflow:
     """End-to-end tests for the complete music analyzer workflow."""
 
-    @pytest.mark.asyncio
     async def test_complete_music_analysis_workflow(
         self,
         client: AsyncClient,
-        async_session: AsyncSession,
-        sample_user_data: dict,
-        mock_spotify_client: AsyncMock,
+        auth_headers: dict[str, str],
+        fake_ai_client: FakeMusicAnalysisAI,
+        wait_for_analysis: Callable[[int, float], Awaitable[None]],
     ):
         """Test the complete music analysis workflow from begin to completion."""
 
-        # Create test user within the test to avoid greenlet issues
-        from src.unwrapped.auth.models import UserCreate
-        from src.unwrapped.core.security import create_user_token
-
-        user_create = UserCreate(**sample_user_data)
-        test_user = User(**user_create.model_dump())
-        test_user.access_token = "test_access_token"
-        test_user.refresh_token = "test_refresh_token"
-
-        async_session.add(test_user)
-        await async_session.commit()
-        await async_session.refresh(test_user)
-
-        # Create JWT token for this user
-        valid_jwt_token = create_user_token(test_user.id)
-
-        # Mock the spotify client and AI client for the background task
-        with (
-            patch(
-                "src.unwrapped.music.spotify_data_collector.spotify_music_client",
-                mock_spotify_client,
-            ),
-            patch(
-                "src.unwrapped.music.token_refresh_service.spotify_music_client",
-                mock_spotify_client,
-            ),
-            patch(
-                "src.unwrapped.music.background_tasks.MusicAnalysisAI"
-            ) as mock_ai_class,
-        ):
-            # Configure mock AI client
-            mock_ai_instance = mock_ai_class.return_value
-            mock_ai_instance.analyze_music_taste = AsyncMock(
-                return_value={
-                    "rating_text": "E2E TEST MUSIC TASTE",
-                    "rating_description": "This is an end-to-end test description of your music taste.",
-                    "critical_acclaim_score": 0.7,
-                    "music_snob_score": 0.3,
-                }
-            )
+        # Configure mock AI client
+        fake_ai_client.result = {
+            "rating_text": "E2E TEST MUSIC TASTE",
+            "rating_description": "This is an end-to-end test description of your music taste.",
+            "critical_acclaim_score": 0.7,
+            "music_snob_score": 0.3,
+        }
 
-            # Step 1: Begin analysis
-            begin_response = await client.post(
-                "/api/v1/music/analysis/begin",
-                headers={"Authorization": f"Bearer {valid_jwt_token}"},
-            )
+        # Step 1: Begin analysis
+        begin_response = await client.post(
+            "/api/v1/music/analysis/begin",
+            headers=auth_headers,
+        )
 
-            assert begin_response.status_code == 200
-            begin_data = begin_response.json()
-
-            # Verify begin response structure
-            assert "analysis_id" in begin_data
-            assert "status" in begin_data
-            assert begin_data["status"] == AnalysisStatus.PENDING
-
-            analysis_id = begin_data["analysis_id"]
-
-            # Step 2: Poll status until completion (with timeout)
-            max_polls = 20  # Maximum number of polls to prevent infinite loop
-            poll_count = 0
-            status = AnalysisStatus.PENDING
-
-            while (
-                status not in [AnalysisStatus.COMPLETED, AnalysisStatus.FAILED]
-                and poll_count < max_polls
-            ):
-                # Small delay to allow background task to process
-                await asyncio.sleep(0.1)
-
-                status_response = await client.get(
-                    "/api/v1/music/analysis/status",
-                    headers={"Authorization": f"Bearer {valid_jwt_token}"},
-                )
-
-                assert status_response.status_code == 200
-                status_data = status_response.json()
-
-                # Verify status response structure
-                assert "analysis_id" in status_data
-                assert "status" in status_data
-                assert "created_at" in status_data
-                assert status_data["analysis_id"] == analysis_id
-
-                status = status_data["status"]
-                poll_count += 1
-
-            # Verify we didn't timeout
-            assert poll_count < max_polls, (
-                "Analysis did not complete within expected time"
-            )
-            assert status == AnalysisStatus.COMPLETED, (
-                f"Analysis failed with status: {status}"
-            )
+        assert begin_response.status_code == 200
+        begin_data = begin_response.json()
 
-            # Step 3: Get completed analysis results
-            result_response = await client.get(
-                "/api/v1/music/analysis/result",
-                headers={"Authorization": f"Bearer {valid_jwt_token}"},
-            )
+        # Verify begin response structure
+        assert "analysis_id" in begin_data
+        assert "status" in begin_data
+        assert begin_data["status"] == AnalysisStatus.PENDING
 
-            assert result_response.status_code == 200
-            result_data = result_response.json()
+        analysis_id = begin_data["analysis_id"]
 
-            # Verify result structure and content
-            assert "rating_text" in result_data
-            assert "rating_description" in result_data
-            assert "critical_acclaim_score" in result_data
-            assert "music_snob_score" in result_data
-            assert "share_token" in result_data
-            assert "analyzed_at" in result_data
+        # Step 2: Wait for the background task, then check the status
+        await wait_for_analysis(analysis_id, 2.0)
 
-            # Verify specific test data
-            assert result_data["rating_text"] == "E2E TEST MUSIC TASTE"
-            assert (
-                result_data["rating_description"]
-                == "This is an end-to-end test description of your music taste."
-            )
-            assert result_data["critical_acclaim_score"] == 0.7
-            assert result_data["music_snob_score"] == 0.3
+        status_response = await client.get(
+            "/api/v1/music/analysis/status",
+            headers=auth_headers,
+        )
 
-            # Verify data types
-            assert isinstance(result_data["rating_text"], str)
-            assert isinstance(result_data["rating_description"], str)
-            assert isinstance(result_data["critical_acclaim_score"], float)
-            assert isinstance(result_data["music_snob_score"], float)
-            assert isinstance(result_data["share_token"], str)
+        assert status_response.status_code == 200
+        status_data = status_response.json()
 
-            # Verify axis positions are within valid range
-            assert 0.0 <= result_data["critical_acclaim_score"] <= 1.0
-            assert 0.0 <= result_data["music_snob_score"] <= 1.0
+        # Verify status response structure
+        assert "analysis_id" in status_data
+        assert "status" in status_data
+        assert "created_at" in status_data
+        assert status_data["analysis_id"] == analysis_id
+        assert status_data["status"] == AnalysisStatus.COMPLETED, (
+            f"Analysis failed with status: {status_data['status']}"
+        )
 
-            # Step 4: Verify the workflow completed successfully
-            # The API responses above already verify the data integrity
-            # Additional verification: ensure we can call the endpoints again
+        # Step 3: Get completed analysis results
+        result_response = await client.get(
+            "/api/v1/music/analysis/result",
+            headers=auth_headers,
+        )
 
-            # Verify status endpoint still works after completion
-            final_status_response = await client.get(
-                "/api/v1/music/analysis/status",
-                headers={"Authorization": f"Bearer {valid_jwt_token}"},
-            )
-            assert final_status_response.status_code == 200
-            final_status_data = final_status_response.json()
-            assert final_status_data["status"] == AnalysisStatus.COMPLETED
+        assert result_response.status_code == 200
+        result_data = result_response.json()
+
+        # Verify result structure and content
+        assert "rating_text" in result_data
+        assert "rating_description" in result_data
+        assert "critical_acclaim_score" in result_data
+        assert "music_snob_score" in result_data
+        assert "share_token" in result_data
+        assert "analyzed_at" in result_data
+
+        # Verify specific test data
+        assert result_data["rating_text"] == "E2E TEST MUSIC TASTE"
+        assert (
+            result_data["rating_description"]
+            == "This is an end-to-end test description of your music taste."
+        )
+        assert result_data["critical_acclaim_score"] == 0.7
+        assert result_data["music_snob_score"] == 0.3
 
-            # Verify result endpoint is consistent
-            second_result_response = await client.get(
-                "/api/v1/music/analysis/result",
-                headers={"Authorization": f"Bearer {valid_jwt_token}"},
-            )
-            assert second_result_response.status_code == 200
-            second_result_data = second_result_response.json()
+        # Verify data types
+        assert isinstance(result_data["rating_text"], str)
+        assert isinstance(result_data["rating_description"], str)
+        assert isinstance(result_data["critical_acclaim_score"], float)
+        assert isinstance(result_data["music_snob_score"], float)
+        assert isinstance(result_data["share_token"], str)
 
-            # Results should be identical
-            assert second_result_data["rating_text"] == result_data["rating_text"]
-            assert second_result_data["share_token"] == result_data["share_token"]
+        # Verify axis positions are within valid range
+        assert 0.0 <= result_data["critical_acclaim_score"] <= 1.0
+        assert 0.0 <= result_data["music_snob_score"] <= 1.0
 
-    @pytest.mark.asyncio
     async def test_idempotent_begin_analysis(
         self,
         client: AsyncClient,
         async_session: AsyncSession,
-        sample_user_data: dict,
-        mock_spotify_client: AsyncMock,
+        auth_headers: dict[str, str],
+        skip_analysis_task: None,
     ):
         """Test that calling begin analysis multiple times returns the same analysis."""
 
-        # Create test user within the test to avoid greenlet issues
-        from src.unwrapped.auth.models import UserCreate
-        from src.unwrapped.core.security import create_user_token
-
-        user_create = UserCreate(**sample_user_data)
-        test_user = User(**user_create.model_dump())
-        test_user.access_token = "test_access_token"
-        test_user.refresh_token = "test_refresh_token"
-
-        async_session.add(test_user)
-        await async_session.commit()
-        await async_session.refresh(test_user)
-
-        # Create JWT token for this user
-        valid_jwt_token = create_user_token(test_user.id)
-
-        with (
-            patch(
-                "src.unwrapped.music.spotify_data_collector.spotify_music_client",
-                mock_spotify_client,
-            ),
-            patch(
-                "src.unwrapped.music.token_refresh_service.spotify_music_client",
-                mock_spotify_client,
-            ),
-            patch(
-                "src.unwrapped.music.background_tasks.MusicAnalysisAI"
-            ) as mock_ai_class,
-        ):
-            mock_ai_instance = mock_ai_class.return_value
-            mock_ai_instance.analyze_music_taste = AsyncMock(
-                return_value={
-                    "rating_text": "IDEMPOTENT TEST",
-                    "rating_description": "Test description",
-                    "critical_acclaim_score": 0.5,
-                    "music_snob_score": 0.5,
-                }
-            )
-
-            # First call to begin analysis
-            first_response = await client.post(
-                "/api/v1/music/analysis/begin",
-                headers={"Authorization": f"Bearer {valid_jwt_token}"},
-            )
+        # First call to begin analysis
+        first_response = await client.post(
+            "/api/v1/music/analysis/begin",
+            headers=auth_headers,
+        )
 
-            assert first_response.status_code == 200
-            first_data = first_response.json()
-            first_analysis_id = first_data["analysis_id"]
+        assert first_response.status_code == 200
+        first_data = first_response.json()
+        first_analysis_id = first_data["analysis_id"]
 
-            # Second call to begin analysis (should return same analysis)
-            second_response = await client.post(
-                "/api/v1/music/analysis/begin",
-                headers={"Authorization": f"Bearer {valid_jwt_token}"},
-            )
+        # Second call to begin analysis (should return same analysis)
+        second_response = await client.post(
+            "/api/v1/music/analysis/begin",
+            headers=auth_headers,
+        )
 
-            assert second_response.status_code == 200
-            second_data = second_response.json()
-            second_analysis_id = second_data["analysis_id"]
+        assert second_response.status_code == 200
+        second_data = second_response.json()
+        second_analysis_id = second_data["analysis_id"]
 
-            # Should return the same analysis ID
-            assert first_analysis_id == second_analysis_id
+        # Should return the same analysis ID
+        assert first_analysis_id == second_analysis_id
 
-            # Third call after some processing time
-            await asyncio.sleep(0.1)
+        # Third call once the analysis has completed; only the status matters
+        # here, so mark it completed rather than running the pipeline
+        await async_session.execute(
+            update(MusicAnalysisResult)
+            .where(MusicAnalysisResult.id == first_analysis_id)
+            .values(status=AnalysisStatus.COMPLETED)
+        )
 
-            third_response = await client.post(
-                "/api/v1/music/analysis/begin",
-                headers={"Authorization": f"Bearer {valid_jwt_token}"},
-            )
+        third_response = await client.post(
+            "/api/v1/music/analysis/begin",
+            headers=auth_headers,
+        )
 
-            assert third_response.status_code == 200
-            third_data = third_response.json()
-            third_analysis_id = third_data["analysis_id"]
+        assert third_response.status_code == 200
+        third_data = third_response.json()
+        third_analysis_id = third_data["analysis_id"]
 
-            # Should still return the same analysis ID
-            assert first_analysis_id == third_analysis_id
+        # Should still return the same analysis ID
+        assert first_analysis_id == third_analysis_id
+        assert third_data["status"] == AnalysisStatus.COMPLETED
 
-    @pytest.mark.asyncio
-    async def test_analysis_error_handling(
+    async def test_result_endpoint_is_idempotent(
         self,
         client: AsyncClient,
-        async_session: AsyncSession,
-        sample_user_data: dict,
-        mock_spotify_client: AsyncMock,
+        auth_headers: dict[str, str],
+        fake_ai_client: FakeMusicAnalysisAI,
+        wait_for_analysis: Callable[[int, float], Awaitable[None]],
     ):
-        """Test error handling when analysis fails completely."""
+        """Test that fetching a completed result repeatedly returns the same data."""
+        fake_ai_client.result = {
+            "rating_text": "REPEATABLE RESULT",
+            "rating_description": "Test description",
+            "critical_acclaim_score": 0.4,
+            "music_snob_score": 0.6,
+        }
 
-        # Create test user within the test to avoid greenlet issues
-        from src.unwrapped.auth.models import UserCreate
-        from src.unwrapped.core.security import create_user_token
+        begin_response = await client.post(
+            "/api/v1/music/analysis/begin",
+            headers=auth_headers,
+        )
+        assert begin_response.status_code == 200
+        await wait_for_analysis(begin_response.json()["analysis_id"], 2.0)
 
-        user_create = UserCreate(**sample_user_data)
-        test_user = User(**user_create.model_dump())
-        test_user.access_token = "test_access_token"
-        test_user.refresh_token = "test_refresh_token"
+        first_response = await client.get(
+            "/api/v1/music/analysis/result",
+            headers=auth_headers,
+        )
+        second_response = await client.get(
+            "/api/v1/music/analysis/result",
+            headers=auth_headers,
+        )
 
-        async_session.add(test_user)
-        await async_session.commit()
-        await async_session.refresh(test_user)
+        assert first_response.status_code == 200
+        assert second_response.status_code == 200
+        assert second_response.json() == first_response.json()
 
-        # Create JWT token for this user
-        valid_jwt_token = create_user_token(test_user.id)
+    async def test_analysis_error_handling(
+        self,
+        client: AsyncClient,
+        auth_headers: dict[str, str],
+        mock_spotify_client: AsyncMock,
+        fake_ai_client: FakeMusicAnalysisAI,
+        wait_for_analysis: Callable[[int, float], Awaitable[None]],
+    ):
+        """Test error handling when analysis fails completely."""
 
         # Configure spotify client to raise an error
         mock_spotify_client.get_user_top_tracks.side_effect = Exception(
             "Spotify API Error"
         )
 
-        with (
-            patch(
-                "src.unwrapped.music.spotify_data_collector.spotify_music_client",
-                mock_spotify_client,
-            ),
-            patch(
-                "src.unwrapped.music.token_refresh_service.spotify_music_client",
-                mock_spotify_client,
-            ),
-            # Also make the AI client fail to force a complete failure
-            patch(
-                "src.unwrapped.music.background_tasks.MusicAnalysisAI"
-            ) as mock_ai_class,
-            # Make the share token generation fail to force a complete failure
-            patch(
-                "src.unwrapped.music.background_tasks.generate_unique_share_token",
-                side_effect=Exception("Database error during share token generation"),
-            ),
-        ):
-            mock_ai_instance = mock_ai_class.return_value
-            mock_ai_instance.analyze_music_taste = AsyncMock(
-                side_effect=Exception("AI service unavailable")
-            )
+        # Also make the AI client fail to force a complete failure
+        fake_ai_client.error = Exception("AI service unavailable")
 
+        # Make the share token generation fail to force a complete failure
+        with patch(
+            "src.unwrapped.music.background_tasks.generate_share_token",
+            side_effect=Exception("Database error during share token generation"),
+        ):
             # Begin analysis
             begin_response = await client.post(
                 "/api/v1/music/analysis/begin",
-                headers={"Authorization": f"Bearer {valid_jwt_token}"},
+                headers=auth_headers,
             )
 
             assert begin_response.status_code == 200
 
-            # Poll status until failure (with timeout)
-            max_polls = 20
-            poll_count = 0
-            status = AnalysisStatus.PENDING
+            await wait_for_analysis(begin_response.json()["analysis_id"], 2.0)
 
-            while (
-                status not in [AnalysisStatus.COMPLETED, AnalysisStatus.FAILED]
-                and poll_count < max_polls
-            ):
-                await asyncio.sleep(0.1)
-
-                status_response = await client.get(
-                    "/api/v1/music/analysis/status",
-                    headers={"Authorization": f"Bearer {valid_jwt_token}"},
-                )
-
-                assert status_response.status_code == 200
-                status_data = status_response.json()
-                status = status_data["status"]
-                poll_count += 1
-
-            # Should eventually fail
-            assert status == AnalysisStatus.FAILED
-
-            # Verify error message is present in status response
+            # Verify the analysis failed with an error message
             final_status_response = await client.get(
                 "/api/v1/music/analysis/status",
-                headers={"Authorization": f"Bearer {valid_jwt_token}"},
+                headers=auth_headers,
             )
+            assert final_status_response.status_code == 200
 
             final_status_data = final_status_response.json()
+            assert final_status_data["status"] == AnalysisStatus.FAILED
             assert final_status_data["error_message"] is not None
             assert (
                 "Database error during share token generation"
@@ -371,79 +300,56 @@ class TestMusicAnalyzerWorkflow:
             # Trying to get results should fail
             result_response = await client.get(
                 "/api/v1/music/analysis/result",
-                headers={"Authorization": f"Bearer {valid_jwt_token}"},
+                headers=auth_headers,
             )
 
             assert result_response.status_code == 400
             error_data = result_response.json()
             assert "not completed" in error_data["detail"].lower()
 
-    @pytest.mark.asyncio
+    @pytest.mark.no_db
+    @pytest.mark.parametrize(
+        ("method", "path"),
+        [
+            ("POST", "/api/v1/music/analysis/begin"),
+            ("GET", "/api/v1/music/analysis/status"),
+            ("GET", "/api/v1/music/analysis/result"),
+        ],
+    )
+    @pytest.mark.parametrize(
+        ("headers", "expected_status"),
+        [
+            ({}, 403),  # No token
+            ({"Authorization": "Bearer invalid_token"}, 401),
+        ],
+    )
     async def test_authentication_required(
         self,
-        client: AsyncClient,
+        http_client: AsyncClient,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+        expected_status: int,
     ):
-        """Test that all endpoints require authentication."""
-
-        # Test begin analysis without token
-        begin_response = await client.post("/api/v1/music/analysis/begin")
-        assert begin_response.status_code == 403
-
-        # Test status without token
-        status_response = await client.get("/api/v1/music/analysis/status")
-        assert status_response.status_code == 403
-
-        # Test result without token
-        result_response = await client.get("/api/v1/music/analysis/result")
-        assert result_response.status_code == 403
-
-        # Test with invalid token
-        invalid_headers = {"Authorization": "Bearer invalid_token"}
-
-        begin_response = await client.post(
-            "/api/v1/music/analysis/begin", headers=invalid_headers
-        )
-        assert begin_response.status_code == 401
-
-        status_response = await client.get(
-            "/api/v1/music/analysis/status", headers=invalid_headers
-        )
-        assert status_response.status_code == 401
+        """Test that all endpoints require authentication.
 
-        result_response = await client.get(
-            "/api/v1/music/analysis/result", headers=invalid_headers
-        )
-        assert result_response.status_code == 401
+        Requests are rejected before touching the database, so this uses the
+        bare client without the per-test session overrides.
+        """
+        response = await http_client.request(method, path, headers=headers)
+        assert response.status_code == expected_status
 
-    @pytest.mark.asyncio
     async def test_no_analysis_found_scenarios(
         self,
         client: AsyncClient,
-        async_session: AsyncSession,
-        sample_user_data: dict,
+        auth_headers: dict[str, str],
     ):
         """Test scenarios where no analysis exists for user."""
 
-        # Create test user within the test to avoid greenlet issues
-        from src.unwrapped.auth.models import UserCreate
-        from src.unwrapped.core.security import create_user_token
-
-        user_create = UserCreate(**sample_user_data)
-        test_user = User(**user_create.model_dump())
-        test_user.access_token = "test_access_token"
-        test_user.refresh_token = "test_refresh_token"
-
-        async_session.add(test_user)
-        await async_session.commit()
-        await async_session.refresh(test_user)
-
-        # Create JWT token for this user
-        valid_jwt_token = create_user_token(test_user.id)
-
         # Test status when no analysis exists
         status_response = await client.get(
             "/api/v1/music/analysis/status",
-            headers={"Authorization": f"Bearer {valid_jwt_token}"},
+            headers=auth_headers,
         )
         assert status_response.status_code == 404
         error_data = status_response.json()
@@ -452,25 +358,22 @@ class TestMusicAnalyzerWorkflow:
         # Test result when no analysis exists
         result_response = await client.get(
             "/api/v1/music/analysis/result",
-            headers={"Authorization": f"Bearer {valid_jwt_token}"},
+            headers=auth_headers,
         )
         assert result_response.status_code == 404
         error_data = result_response.json()
         assert "No analysis found" in error_data["detail"]
 
-    @pytest.mark.asyncio
     async def test_analysis_with_existing_user_data(
         self,
         client: AsyncClient,
-        async_session: AsyncSession,
-        sample_user_data: dict,
-        mock_spotify_client: AsyncMock,
+        fake_ai_client: FakeMusicAnalysisAI,
+        wait_for_analysis: Callable[[int, float], Awaitable[None]],
+        insert_row,
     ):
         """Test analysis workflow with a user that has existing Spotify tokens."""
 
         # Create a user with Spotify tokens
-        from src.unwrapped.core.security import create_user_token
-
         test_user_with_tokens = User(
             spotify_id="test_spotify_user_with_tokens",
             email="test_with_tokens@example.com",
@@ -481,77 +384,47 @@ class TestMusicAnalyzerWorkflow:
             token_expires_at=datetime.now(UTC) + timedelta(hours=1),
         )
 
-        async_session.add(test_user_with_tokens)
-        await async_session.commit()
-        await async_session.refresh(test_user_with_tokens)
+        test_user_with_tokens = await insert_row(test_user_with_tokens)
 
         # Create a JWT token for this user
         user_jwt_token = create_user_token(test_user_with_tokens.id)
+        user_auth_headers = {"Authorization": f"Bearer {user_jwt_token}"}
 
-        with (
-            patch(
-                "src.unwrapped.music.spotify_data_collector.spotify_music_client",
-                mock_spotify_client,
-            ),
-            patch(
-                "src.unwrapped.music.token_refresh_service.spotify_music_client",
-                mock_spotify_client,
-            ),
-            patch(
-                "src.unwrapped.music.background_tasks.MusicAnalysisAI"
-            ) as mock_ai_class,
-        ):
-            mock_ai_instance = mock_ai_class.return_value
-            mock_ai_instance.analyze_music_taste = AsyncMock(
-                return_value={
-                    "rating_text": "TOKEN USER TEST",
-                    "rating_description": "Analysis for user with existing tokens.",
-                    "critical_acclaim_score": -0.2,
-                    "music_snob_score": 0.8,
-                }
-            )
+        fake_ai_client.result = {
+            "rating_text": "TOKEN USER TEST",
+            "rating_description": "Analysis for user with existing tokens.",
+            "critical_acclaim_score": -0.2,
+            "music_snob_score": 0.8,
+        }
 
-            # Begin analysis
-            begin_response = await client.post(
-                "/api/v1/music/analysis/begin",
-                headers={"Authorization": f"Bearer {user_jwt_token}"},
-            )
-
-            assert begin_response.status_code == 200
-            begin_data = begin_response.json()
-            assert begin_data["status"] == AnalysisStatus.PENDING
-
-            # Wait for completion
-            max_polls = 20
-            poll_count = 0
-            status = AnalysisStatus.PENDING
+        # Begin analysis
+        begin_response = await client.post(
+            "/api/v1/music/analysis/begin",
+            headers=user_auth_headers,
+        )
 
-            while (
-                status not in [AnalysisStatus.COMPLETED, AnalysisStatus.FAILED]
-                and poll_count < max_polls
-            ):
-                await asyncio.sleep(0.1)
+        assert begin_response.status_code == 200
+        begin_data = begin_response.json()
+        assert begin_data["status"] == AnalysisStatus.PENDING
 
-                status_response = await client.get(
-                    "/api/v1/music/analysis/status",
-                    headers={"Authorization": f"Bearer {user_jwt_token}"},
-                )
+        await wait_for_analysis(begin_data["analysis_id"], 2.0)
 
-                assert status_response.status_code == 200
-                status_data = status_response.json()
-                status = status_data["status"]
-                poll_count += 1
+        status_response = await client.get(
+            "/api/v1/music/analysis/status",
+            headers=user_auth_headers,
+        )
 
-            assert status == AnalysisStatus.COMPLETED
+        assert status_response.status_code == 200
+        assert status_response.json()["status"] == AnalysisStatus.COMPLETED
 
-            # Get results
-            result_response = await client.get(
-                "/api/v1/music/analysis/result",
-                headers={"Authorization": f"Bearer {user_jwt_token}"},
-            )
+        # Get results
+        result_response = await client.get(
+            "/api/v1/music/analysis/result",
+            headers=user_auth_headers,
+        )
 
-            assert result_response.status_code == 200
-            result_data = result_response.json()
-            assert result_data["rating_text"] == "TOKEN USER TEST"
-            assert result_data["critical_acclaim_score"] == 0.2
-            assert result_data["music_snob_score"] == 0.8
+        assert result_response.status_code == 200
+        result_data = result_response.json()
+        assert result_data["rating_text"] == "TOKEN USER TEST"
+        assert result_data["critical_acclaim_score"] == -0.2
+        assert result_data["music_snob_score"] == 0.8
@@ -0,0 +1,146 @@
+"""Tests for the Spotify music client's rate limiting and retry backoff."""
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from src.unwrapped.core.exceptions import SpotifyAPIError
+from src.unwrapped.music.spotify import RequestRateLimiter, SpotifyMusicClient
+
+
+class FakeClock:
+    """Monotonic clock that only moves when something sleeps on it."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Fake clock to hand to the rate limiter and client."""
+    return FakeClock()
+
+
+@pytest_asyncio.fixture
+async def make_client(clock: FakeClock):
+    """Build clients whose requests get the given responses in turn.
+
+    They sleep on the fake clock; their HTTP clients are closed afterwards.
+    """
+    http_clients: list[httpx.AsyncClient] = []
+
+    def build(*responses: httpx.Response) -> SpotifyMusicClient:
+        pending = iter(responses)
+        client = SpotifyMusicClient(sleep=clock.sleep)
+        client.rate_limiter = RequestRateLimiter(
+            1000.0, monotonic=clock.monotonic, sleep=clock.sleep
+        )
+        client.client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: next(pending))
+        )
+        http_clients.append(client.client)
+        return client
+
+    yield build
+
+    for http_client in http_clients:
+        await http_client.aclose()
+
+
+async def test_acquire_spaces_requests_by_rate(clock: FakeClock) -> None:
+    """Test that request starts are spaced 1/rate seconds apart."""
+    limiter = RequestRateLimiter(4.0, monotonic=clock.monotonic, sleep=clock.sleep)
+
+    for _ in range(3):
+        await limiter.acquire()
+
+    assert clock.sleeps == [0.25, 0.25]
+
+
+def test_throttle_halves_rate_down_to_minimum() -> None:
+    """Test the multiplicative decrease after the server throttles us."""
+    limiter = RequestRateLimiter(4.0)
+
+    limiter.throttle()
+    assert limiter.rate == 2.0
+
+    for _ in range(10):
+        limiter.throttle()
+    assert limiter.rate == RequestRateLimiter.MIN_RATE
+
+
+def test_recover_adds_step_up_to_maximum() -> None:
+    """Test the additive increase after successful requests."""
+    limiter = RequestRateLimiter(4.0)
+    limiter.throttle()
+
+    limiter.recover()
+    assert limiter.rate == pytest.approx(2.0 + RequestRateLimiter.RECOVERY_STEP)
+
+    for _ in range(100):
+        limiter.recover()
+    assert limiter.rate == 4.0
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({"Retry-After": "3"}, 3.0),
+        ({"Retry-After": "1.5"}, 1.5),
+        ({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, None),
+        ({"retry-after-ms": "1500"}, None),
+        ({}, None),
+    ],
+)
+def test_retry_after_parsing(headers: dict[str, str], expected: float | None) -> None:
+    """Test that only a numeric Retry-After header is honoured."""
+    response = httpx.Response(429, headers=headers)
+
+    assert SpotifyMusicClient._retry_after(response) == expected
+
+
+def test_backoff_doubles_up_to_cap() -> None:
+    """Test the exponential backoff bounds per retry attempt."""
+    bounds = [SpotifyMusicClient._backoff(attempt) for attempt in range(8)]
+
+    assert bounds[:4] == [0.5, 1.0, 2.0, 4.0]
+    assert max(bounds) == SpotifyMusicClient.RETRY_BACKOFF_CAP
+
+
+async def test_rate_limited_request_backs_off_with_full_jitter(
+    clock: FakeClock, make_client
+) -> None:
+    """Test that 429s without Retry-After sleep up to the backoff bound."""
+    client = make_client(
+        httpx.Response(429),
+        httpx.Response(429),
+        httpx.Response(200, json={"items": []}),
+    )
+
+    assert await client._make_request("GET", "https://api.test/me") == {"items": []}
+    assert len(clock.sleeps) == 2
+    for attempt, delay in enumerate(clock.sleeps):
+        assert 0 <= delay <= SpotifyMusicClient._backoff(attempt)
+
+
+async def test_rate_limited_request_honours_retry_after(
+    clock: FakeClock, make_client
+) -> None:
+    """Test that Retry-After sets the delay, plus at most a second of jitter."""
+    client = make_client(
+        httpx.Response(429, headers={"Retry-After": "3"}),
+        httpx.Response(429, headers={"Retry-After": "3"}),
+    )
+
+    with pytest.raises(SpotifyAPIError, match="Retry after 3 seconds"):
+        await client._make_request("GET", "https://api.test/me", retries=1)
+    assert len(clock.sleeps) == 1
+    assert 3.0 <= clock.sleeps[0] <= 4.0
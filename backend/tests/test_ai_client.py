@@ -1,7 +1,7 @@
 """Tests for AI music analysis client."""
 
 import json
-from unittest.mock import AsyncMock, patch
+from types import SimpleNamespace
 
 import pytest
 
@@ -9,14 +9,85 @@ from src.unwrapped.core.exceptions import SpotifyAPIError
 from src.unwrapped.music.ai_client import MusicAnalysisAI
 
 
+class FakeCompletionStream:
+    """Stand-in for the streamed chat completion returned by the OpenAI client."""
+
+    def __init__(self, *deltas: str | None):
+        self.deltas = deltas
+        self.consumed = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for delta in self.deltas:
+            self.consumed += 1
+            yield SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))]
+            )
+
+    async def close(self):
+        self.closed = True
+
+
+def stream_json(content: str) -> FakeCompletionStream:
+    """Stream a JSON document in two chunks, as the API would in many."""
+    middle = len(content) // 2
+    return FakeCompletionStream(content[:middle], content[middle:])
+
+
+# AI responses are rendered to JSON once at import rather than per test
+SUCCESS_RESPONSE = json.dumps(
+    {
+        "rating_text": "TEST RATING",
+        "rating_description": "This is a test description of music taste.",
+        "critical_acclaim_score": 0.5,
+        "music_snob_score": 0.3,
+    }
+)
+MISSING_FIELDS_RESPONSE = json.dumps({"rating_text": "TEST RATING"})
+OUT_OF_RANGE_RESPONSE = json.dumps(
+    {
+        "rating_text": "TEST RATING",
+        "rating_description": "Test description",
+        "critical_acclaim_score": 2.0,
+        "music_snob_score": -2.0,
+    }
+)
+BRACES_IN_STRINGS_RESPONSE = json.dumps(
+    {
+        "rating_text": "TEST RATING",
+        "rating_description": "Braces {like these} stay inside strings.",
+        "critical_acclaim_score": 0.5,
+        "music_snob_score": 0.3,
+    }
+)
+
+
+@pytest.fixture(scope="module")
+def ai_client():
+    """Create AI client for testing.
+
+    The client is stateless apart from the OpenAI SDK client, whose create
+    method tests patch per test, so one instance serves every test.
+    """
+    return MusicAnalysisAI()
+
+
+@pytest.fixture
+def respond_with(monkeypatch, ai_client):
+    """Make the AI client's chat completion call return a given stream."""
+
+    def stub(completion: FakeCompletionStream) -> None:
+        async def create(**kwargs):
+            return completion
+
+        monkeypatch.setattr(ai_client.client.chat.completions, "create", create)
+
+    return stub
+
+
 class TestMusicAnalysisAI:
     """Test AI music analysis client."""
 
-    @pytest.fixture
-    def ai_client(self):
-        """Create AI client for testing."""
-        return MusicAnalysisAI()
-
     @pytest.fixture
     def sample_music_data(self):
         """Sample music data for testing."""
@@ -53,28 +124,14 @@ class TestMusicAnalysisAI:
             "recently_played": {"items": []},
         }
 
-    @pytest.mark.asyncio
-    async def test_analyze_music_taste_success(self, ai_client, sample_music_data):
+    async def test_analyze_music_taste_success(
+        self, ai_client, sample_music_data, respond_with
+    ):
         """Test successful AI analysis."""
-        # Mock the OpenAI client response
-        mock_response = {
-            "rating_text": "TEST RATING",
-            "rating_description": "This is a test description of music taste.",
-            "critical_acclaim_score": 0.5,
-            "music_snob_score": 0.3,
-        }
-
-        mock_completion = AsyncMock()
-        mock_completion.choices = [AsyncMock()]
-        mock_completion.choices[0].message.content = json.dumps(mock_response)
+        mock_completion = stream_json(SUCCESS_RESPONSE)
 
-        with patch.object(
-            ai_client.client.chat.completions,
-            "create",
-            new_callable=AsyncMock,
-            return_value=mock_completion,
-        ):
-            result = await ai_client.analyze_music_taste(sample_music_data)
+        respond_with(mock_completion)
+        result = await ai_client.analyze_music_taste(sample_music_data)
 
         assert result["rating_text"] == "TEST RATING"
         assert (
@@ -83,91 +140,68 @@ class TestMusicAnalysisAI:
         assert result["critical_acclaim_score"] == 0.5
         assert result["music_snob_score"] == 0.3
 
-    @pytest.mark.asyncio
     async def test_analyze_music_taste_empty_response(
-        self, ai_client, sample_music_data
+        self, ai_client, sample_music_data, respond_with
     ):
         """Test handling of empty AI response."""
-        mock_completion = AsyncMock()
-        mock_completion.choices = [AsyncMock()]
-        mock_completion.choices[0].message.content = None
-
-        with patch.object(
-            ai_client.client.chat.completions,
-            "create",
-            new_callable=AsyncMock,
-            return_value=mock_completion,
-        ):
-            with pytest.raises(SpotifyAPIError, match="Empty response from AI"):
-                await ai_client.analyze_music_taste(sample_music_data)
-
-    @pytest.mark.asyncio
-    async def test_analyze_music_taste_invalid_json(self, ai_client, sample_music_data):
+        mock_completion = FakeCompletionStream(None)
+
+        respond_with(mock_completion)
+        with pytest.raises(SpotifyAPIError, match="Empty response from AI"):
+            await ai_client.analyze_music_taste(sample_music_data)
+
+    async def test_analyze_music_taste_invalid_json(
+        self, ai_client, sample_music_data, respond_with
+    ):
         """Test handling of invalid JSON response."""
-        mock_completion = AsyncMock()
-        mock_completion.choices = [AsyncMock()]
-        mock_completion.choices[0].message.content = "invalid json"
-
-        with patch.object(
-            ai_client.client.chat.completions,
-            "create",
-            new_callable=AsyncMock,
-            return_value=mock_completion,
-        ):
-            with pytest.raises(SpotifyAPIError, match="Invalid JSON response from AI"):
-                await ai_client.analyze_music_taste(sample_music_data)
-
-    @pytest.mark.asyncio
+        mock_completion = FakeCompletionStream("invalid json")
+
+        respond_with(mock_completion)
+        with pytest.raises(SpotifyAPIError, match="Invalid JSON response from AI"):
+            await ai_client.analyze_music_taste(sample_music_data)
+
     async def test_analyze_music_taste_missing_fields(
-        self, ai_client, sample_music_data
+        self, ai_client, sample_music_data, respond_with
     ):
         """Test handling of response missing required fields."""
-        mock_response = {
-            "rating_text": "TEST RATING",
-            # Missing other required fields
-        }
-
-        mock_completion = AsyncMock()
-        mock_completion.choices = [AsyncMock()]
-        mock_completion.choices[0].message.content = json.dumps(mock_response)
+        mock_completion = stream_json(MISSING_FIELDS_RESPONSE)
 
-        with patch.object(
-            ai_client.client.chat.completions,
-            "create",
-            new_callable=AsyncMock,
-            return_value=mock_completion,
-        ):
-            with pytest.raises(SpotifyAPIError, match="Missing required field"):
-                await ai_client.analyze_music_taste(sample_music_data)
+        respond_with(mock_completion)
+        with pytest.raises(SpotifyAPIError, match="Missing required field"):
+            await ai_client.analyze_music_taste(sample_music_data)
 
-    @pytest.mark.asyncio
     async def test_analyze_music_taste_axis_clamping(
-        self, ai_client, sample_music_data
+        self, ai_client, sample_music_data, respond_with
     ):
         """Test that axis positions are clamped to valid range."""
-        mock_response = {
-            "rating_text": "TEST RATING",
-            "rating_description": "Test description",
-            "critical_acclaim_score": 2.0,  # Out of range
-            "music_snob_score": -2.0,  # Out of range
-        }
-
-        mock_completion = AsyncMock()
-        mock_completion.choices = [AsyncMock()]
-        mock_completion.choices[0].message.content = json.dumps(mock_response)
+        # Both scores are out of range
+        mock_completion = stream_json(OUT_OF_RANGE_RESPONSE)
 
-        with patch.object(
-            ai_client.client.chat.completions,
-            "create",
-            new_callable=AsyncMock,
-            return_value=mock_completion,
-        ):
-            result = await ai_client.analyze_music_taste(sample_music_data)
+        respond_with(mock_completion)
+        result = await ai_client.analyze_music_taste(sample_music_data)
 
         # Values should be clamped to [-1.0, 1.0]
         assert result["critical_acclaim_score"] == 1.0
         assert result["music_snob_score"] == -1.0
 
+    async def test_analyze_music_taste_stops_at_complete_json(
+        self, ai_client, sample_music_data, respond_with
+    ):
+        """Test that streaming stops once the JSON object is complete."""
+        content = BRACES_IN_STRINGS_RESPONSE
+        mock_completion = FakeCompletionStream(
+            content[:40], content[40:], "\n", "\n", "\n"
+        )
+
+        respond_with(mock_completion)
+        result = await ai_client.analyze_music_taste(sample_music_data)
+
+        assert (
+            result["rating_description"] == "Braces {like these} stay inside strings."
+        )
+        assert mock_completion.consumed == 2
+        assert mock_completion.closed
+
     def test_prepare_music_summary(self, ai_client, sample_music_data):
         """Test music data summary preparation."""
         summary = ai_client._prepare_music_summary(sample_music_data)
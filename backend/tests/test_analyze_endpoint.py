@@ -1,52 +1,55 @@
 """Tests for music analysis endpoints."""
 
-from unittest.mock import patch
+import asyncio
 
 import pytest
 from httpx import AsyncClient
 
-from src.unwrapped.music.models import MusicAnalysisResult
+from src.unwrapped.music import analysis_coordinator, analysis_events, analyze_router
+from src.unwrapped.music.analysis_events import (
+    notify_analysis_status,
+    stream_analysis_events,
+)
+from src.unwrapped.music.models import AnalysisStatus, MusicAnalysisResult
+from tests.utils.fakes import FakeMusicAnalysisAI
+
+
+async def insert_analysis(
+    insert_row, session, user_id: int, status: AnalysisStatus
+) -> int:
+    """Insert and commit an analysis, so the event listener's connection sees it."""
+    analysis = await insert_row(MusicAnalysisResult(user_id=user_id, status=status))
+    analysis_id = analysis.id
+    await session.commit()
+    return analysis_id
 
 
 class TestAnalyzeEndpoints:
     """Test music analysis endpoints."""
 
-    @pytest.mark.asyncio
     async def test_analyze_music_taste_success(
-        self, client: AsyncClient, test_user, valid_jwt_token, mock_spotify_client
+        self,
+        client: AsyncClient,
+        test_user,
+        auth_headers,
+        patched_spotify_client,
+        monkeypatch,
     ):
         """Test successful music taste analysis."""
-        # Mock the spotify client and AI client
-        with (
-            patch(
-                "src.unwrapped.music.spotify_data_collector.spotify_music_client",
-                mock_spotify_client,
-            ),
-            patch(
-                "src.unwrapped.music.token_refresh_service.spotify_music_client",
-                mock_spotify_client,
-            ),
-            patch(
-                "src.unwrapped.music.analysis_coordinator.MusicAnalysisAI"
-            ) as mock_ai_class,
-        ):
-            # Configure mock AI client to return a test response
-            mock_ai_instance = mock_ai_class.return_value
-
-            async def mock_analyze_music_taste(music_data):
-                return {
-                    "rating_text": "TEST MUSIC TASTE",
-                    "rating_description": "This is a test description of your music taste.",
-                    "critical_acclaim_score": 0.5,
-                    "music_snob_score": 0.2,
-                }
-
-            mock_ai_instance.analyze_music_taste = mock_analyze_music_taste
-
-            response = await client.post(
-                "/api/v1/music/analyze",
-                headers={"Authorization": f"Bearer {valid_jwt_token}"},
-            )
+        ai_client = FakeMusicAnalysisAI(
+            result={
+                "rating_text": "TEST MUSIC TASTE",
+                "rating_description": "This is a test description of your music taste.",
+                "critical_acclaim_score": 0.5,
+                "music_snob_score": 0.2,
+            }
+        )
+        monkeypatch.setattr(analysis_coordinator, "music_analysis_ai", ai_client)
+
+        response = await client.post(
+            "/api/v1/music/analyze",
+            headers=auth_headers,
+        )
 
         assert response.status_code == 200
         data = response.json()
@@ -69,42 +72,38 @@ class TestAnalyzeEndpoints:
         assert 0.0 <= data["critical_acclaim_score"] <= 1.0
         assert 0.0 <= data["music_snob_score"] <= 1.0
 
-    @pytest.mark.asyncio
-    async def test_analyze_music_taste_no_token(self, client: AsyncClient):
+    @pytest.mark.no_db
+    async def test_analyze_music_taste_no_token(self, http_client: AsyncClient):
         """Test analyze endpoint without authentication token."""
-        response = await client.post("/api/v1/music/analyze")
+        response = await http_client.post("/api/v1/music/analyze")
         assert response.status_code == 403
 
-    @pytest.mark.asyncio
-    async def test_analyze_music_taste_invalid_token(self, client: AsyncClient):
+    @pytest.mark.no_db
+    async def test_analyze_music_taste_invalid_token(self, http_client: AsyncClient):
         """Test analyze endpoint with invalid authentication token."""
-        response = await client.post(
+        response = await http_client.post(
             "/api/v1/music/analyze",
             headers={"Authorization": "Bearer invalid_token"},
         )
         assert response.status_code == 401
 
-    @pytest.mark.asyncio
     async def test_get_latest_analysis_no_data(
-        self, client: AsyncClient, test_user, valid_jwt_token
+        self, client: AsyncClient, test_user, auth_headers
     ):
         """Test getting latest analysis when no analysis exists."""
         response = await client.get(
             "/api/v1/music/analysis/latest",
-            headers={"Authorization": f"Bearer {valid_jwt_token}"},
+            headers=auth_headers,
         )
 
         assert response.status_code == 200
         assert response.json() is None
 
-    @pytest.mark.asyncio
     async def test_get_latest_analysis_with_data(
-        self, client: AsyncClient, test_user, valid_jwt_token, async_session
+        self, client: AsyncClient, test_user, auth_headers, insert_row
     ):
         """Test getting latest analysis when analysis exists."""
         # Create a test analysis result
-        from src.unwrapped.music.models import AnalysisStatus
-
         analysis = MusicAnalysisResult(
             user_id=test_user.id,
             status=AnalysisStatus.COMPLETED,
@@ -114,13 +113,11 @@ class TestAnalyzeEndpoints:
             music_snob_score=0.3,
             share_token="test_share_token",
         )
-        async_session.add(analysis)
-        await async_session.commit()
-        await async_session.refresh(analysis)
+        analysis = await insert_row(analysis)
 
         response = await client.get(
             "/api/v1/music/analysis/latest",
-            headers={"Authorization": f"Bearer {valid_jwt_token}"},
+            headers=auth_headers,
         )
 
         assert response.status_code == 200
@@ -132,3 +129,120 @@ class TestAnalyzeEndpoints:
         assert data["music_snob_score"] == 0.3
         assert data["share_token"] == "test_share_token"
         assert "analyzed_at" in data
+
+    async def test_analysis_events_completed(
+        self, client: AsyncClient, test_user, auth_headers, async_session, insert_row
+    ):
+        """Test event stream closes after a single event for a finished analysis."""
+        analysis = MusicAnalysisResult(
+            user_id=test_user.id,
+            status=AnalysisStatus.COMPLETED,
+            rating_text="TEST RATING",
+            rating_description="Test description",
+            critical_acclaim_score=0.5,
+            music_snob_score=0.3,
+            share_token="test_share_token",
+        )
+        analysis_id = (await insert_row(analysis)).id
+        # The endpoint reads over the event listener's own connection
+        await async_session.commit()
+
+        response = await client.get(
+            "/api/v1/music/analysis/events",
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == (
+            "event: status\n"
+            f'data: {{"analysis_id":{analysis_id},"status":"completed"}}\n\n'
+        )
+
+    async def test_analysis_events_no_analysis(
+        self, client: AsyncClient, test_user, auth_headers
+    ):
+        """Test event stream returns 404 when user has no analysis."""
+        response = await client.get(
+            "/api/v1/music/analysis/events",
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 404
+
+    async def test_analysis_events_delivers_notifications(
+        self, analysis_event_listener, test_user, async_session, insert_row
+    ):
+        """Test a pg_notify sent for a running analysis reaches its stream."""
+        analysis_id = await insert_analysis(
+            insert_row, async_session, test_user.id, AnalysisStatus.PENDING
+        )
+        events = stream_analysis_events(
+            analysis_event_listener, analysis_id, AnalysisStatus.PENDING
+        )
+
+        assert await anext(events) == (
+            "event: status\n"
+            f'data: {{"analysis_id":{analysis_id},"status":"pending"}}\n\n'
+        )
+
+        await notify_analysis_status(
+            async_session, analysis_id, AnalysisStatus.COMPLETED
+        )
+        await async_session.commit()
+
+        assert await asyncio.wait_for(anext(events), timeout=5) == (
+            "event: status\n"
+            f'data: {{"analysis_id":{analysis_id},"status":"completed"}}\n\n'
+        )
+        with pytest.raises(StopAsyncIteration):
+            await anext(events)
+
+    async def test_analysis_events_stream_is_time_limited(
+        self, analysis_event_listener, test_user, async_session, monkeypatch, insert_row
+    ):
+        """Test a stream for an analysis that never finishes still closes."""
+        monkeypatch.setattr(analysis_events, "MAX_STREAM_DURATION", 0.05)
+        analysis_id = await insert_analysis(
+            insert_row, async_session, test_user.id, AnalysisStatus.PROCESSING
+        )
+
+        events = [
+            event
+            async for event in stream_analysis_events(
+                analysis_event_listener, analysis_id, AnalysisStatus.PENDING
+            )
+        ]
+
+        # The status is re-read after subscribing, then the stream gives up
+        assert events == [
+            "event: status\n"
+            f'data: {{"analysis_id":{analysis_id},"status":"processing"}}\n\n'
+        ]
+
+    async def test_analysis_events_hold_no_pooled_connection(
+        self,
+        async_engine,
+        analysis_event_listener,
+        test_user,
+        async_session,
+        insert_row,
+    ):
+        """Test an open event stream does not keep a pool connection checked out."""
+        user_id = test_user.id
+        analysis_id = await insert_analysis(
+            insert_row, async_session, user_id, AnalysisStatus.PENDING
+        )
+        # Connect the shared listener before taking the baseline
+        await analysis_event_listener.current_status(analysis_id)
+        checked_out = async_engine.pool.checkedout()
+
+        response = await analyze_router.stream_analysis_status(
+            listener=analysis_event_listener, current_user_id=user_id
+        )
+        events = response.body_iterator
+        try:
+            await anext(events)
+            assert async_engine.pool.checkedout() == checked_out
+        finally:
+            await events.aclose()
@@ -3,9 +3,11 @@
 from datetime import UTC, datetime, timedelta
 from unittest.mock import patch
 
+import jwt
 import pytest
 from fastapi import HTTPException
-from jose import jwt
+from fastapi.security import HTTPAuthorizationCredentials
+from freezegun import freeze_time
 
 from src.unwrapped.core.config import settings
 from src.unwrapped.core.dependencies import get_current_user_id
@@ -15,6 +17,26 @@ from src.unwrapped.core.security import (
     verify_token,
 )
 
+# Token expiries are checked against this instant with the clock frozen
+FROZEN_NOW = datetime(2025, 1, 1, tzinfo=UTC)
+
+# Rejected tokens, signed once at import
+WRONG_SIGNATURE_TOKEN = jwt.encode(
+    {"sub": "123", "exp": datetime.now(UTC) + timedelta(hours=1)},
+    "wrong_secret",
+    algorithm=settings.algorithm,
+)
+EXPIRED_TOKEN = jwt.encode(
+    {"sub": "123", "exp": datetime.now(UTC) - timedelta(hours=1)},
+    settings.secret_key,
+    algorithm=settings.algorithm,
+)
+NO_SUB_TOKEN = jwt.encode(
+    {"exp": datetime.now(UTC) + timedelta(hours=1)},
+    settings.secret_key,
+    algorithm=settings.algorithm,
+)
+
 
 class TestAuthFunctions:
     """Test cases for authentication functions."""
@@ -33,6 +55,7 @@ class TestAuthFunctions:
         assert payload["sub"] == str(test_user.id)
         assert "exp" in payload
 
+    @freeze_time(FROZEN_NOW)
     def test_create_access_token_custom_expires(self, test_user):
         """Test creating an access token with custom expiration."""
         custom_expires = timedelta(hours=2)
@@ -44,11 +67,8 @@ class TestAuthFunctions:
             token, settings.secret_key, algorithms=[settings.algorithm]
         )
 
-        # Check that expiration is approximately 2 hours from now
         exp_time = datetime.fromtimestamp(payload["exp"], tz=UTC)
-        expected_time = datetime.now(UTC) + custom_expires
-        time_diff = abs((exp_time - expected_time).total_seconds())
-        assert time_diff < 60  # Within 1 minute tolerance
+        assert exp_time == FROZEN_NOW + custom_expires
 
     def test_verify_token_valid(self, valid_jwt_token):
         """Test verifying a valid JWT token."""
@@ -58,52 +78,23 @@ class TestAuthFunctions:
         assert "sub" in payload
         assert "exp" in payload
 
-    def test_verify_token_invalid_signature(self):
-        """Test verifying a token with invalid signature."""
-        # Create a token with a different secret
-        fake_token = jwt.encode(
-            {"sub": "123", "exp": datetime.now(UTC) + timedelta(hours=1)},
-            "wrong_secret",
-            algorithm=settings.algorithm,
-        )
-
-        payload = verify_token(fake_token)
-        assert payload is None
-
-    def test_verify_token_expired(self):
-        """Test verifying an expired token."""
-        # Create an expired token
-        expired_payload = {
-            "sub": "123",
-            "exp": datetime.now(UTC) - timedelta(hours=1),  # Expired 1 hour ago
-        }
-        expired_token = jwt.encode(
-            expired_payload, settings.secret_key, algorithm=settings.algorithm
-        )
-
-        payload = verify_token(expired_token)
-        assert payload is None
-
-    def test_verify_token_invalid_format(self):
-        """Test verifying a malformed token."""
-        payload = verify_token("invalid.token.format")
-        assert payload is None
+    @pytest.mark.parametrize(
+        "bad_token",
+        [
+            WRONG_SIGNATURE_TOKEN,
+            EXPIRED_TOKEN,
+            "invalid.token.format",
+            None,
+            "",
+        ],
+        ids=["invalid_signature", "expired", "invalid_format", "none", "empty"],
+    )
+    def test_verify_token_rejects(self, bad_token):
+        """Test that invalid, expired, malformed and missing tokens are rejected."""
+        assert verify_token(bad_token) is None
 
-    def test_verify_token_none_input(self):
-        """Test verifying None token."""
-        payload = verify_token(None)
-        assert payload is None
-
-    def test_verify_token_empty_string(self):
-        """Test verifying empty string token."""
-        payload = verify_token("")
-        assert payload is None
-
-    @pytest.mark.asyncio
     async def test_get_current_user_id_valid_token(self, valid_jwt_token, test_user):
         """Test getting current user ID from valid token."""
-        from fastapi.security import HTTPAuthorizationCredentials
-
         credentials = HTTPAuthorizationCredentials(
             scheme="Bearer", credentials=valid_jwt_token
         )
@@ -111,11 +102,8 @@ class TestAuthFunctions:
 
         assert user_id == test_user.id
 
-    @pytest.mark.asyncio
     async def test_get_current_user_id_invalid_token(self):
         """Test getting current user ID with invalid token."""
-        from fastapi.security import HTTPAuthorizationCredentials
-
         credentials = HTTPAuthorizationCredentials(
             scheme="Bearer", credentials="invalid_token"
         )
@@ -125,19 +113,10 @@ class TestAuthFunctions:
 
         assert exc_info.value.status_code == 401
 
-    @pytest.mark.asyncio
     async def test_get_current_user_id_missing_sub(self):
         """Test getting current user ID with token missing sub claim."""
-        from fastapi.security import HTTPAuthorizationCredentials
-
-        # Create token without 'sub' claim
-        invalid_payload = {"exp": datetime.now(UTC) + timedelta(hours=1)}
-        invalid_token = jwt.encode(
-            invalid_payload, settings.secret_key, algorithm=settings.algorithm
-        )
-
         credentials = HTTPAuthorizationCredentials(
-            scheme="Bearer", credentials=invalid_token
+            scheme="Bearer", credentials=NO_SUB_TOKEN
         )
 
         with pytest.raises(HTTPException) as exc_info:
@@ -145,6 +124,7 @@ class TestAuthFunctions:
 
         assert exc_info.value.status_code == 401
 
+    @freeze_time(FROZEN_NOW)
     def test_create_access_token_default_expiry(self):
         """Test creating access token with default expiry."""
         token = create_access_token({"sub": "123"})
@@ -153,25 +133,19 @@ class TestAuthFunctions:
             token, settings.secret_key, algorithms=[settings.algorithm]
         )
 
-        # Should have default expiration - check that it's reasonable (not too far off)
         exp_time = datetime.fromtimestamp(payload["exp"], tz=UTC)
-        now = datetime.now(UTC)
-        time_diff = (exp_time - now).total_seconds()
-
-        # Should be close to the configured expiration time (within reasonable tolerance)
-        expected_seconds = settings.access_token_expire_minutes * 60
-        assert abs(time_diff - expected_seconds) < 120  # Within 2 minutes tolerance
+        assert exp_time == FROZEN_NOW + timedelta(
+            minutes=settings.access_token_expire_minutes
+        )
 
     def test_create_access_token_missing_secret(self):
         """Test token creation when secret is not configured."""
-        # This test verifies that jose properly handles empty/None secrets by raising an error
-        from jose.exceptions import JWSError
-
+        # PyJWT refuses to sign with a missing secret
         with patch("src.unwrapped.core.security.settings") as mock_settings:
             mock_settings.secret_key = None
             mock_settings.algorithm = "HS256"
             mock_settings.access_token_expire_minutes = 30
 
             # Should raise an error when trying to create token with None secret
-            with pytest.raises(JWSError):
+            with pytest.raises(TypeError):
                 create_access_token({"sub": "123"})
@@ -12,7 +12,6 @@ from src.unwrapped.core.security import create_user_token
 class TestAuthEndpoints:
     """Test cases for authentication endpoints."""
 
-    @pytest.mark.asyncio
     async def test_login_endpoint_success(self, client):
         """Test successful login endpoint."""
         with patch("src.unwrapped.auth.router.spotify_auth_client") as mock_spotify:
@@ -29,7 +28,6 @@ class TestAuthEndpoints:
                 "https://accounts.spotify.com/authorize"
             )
 
-    @pytest.mark.asyncio
     async def test_login_endpoint_spotify_error(self, client):
         """Test login endpoint with Spotify client error."""
         with patch("src.unwrapped.auth.router.spotify_auth_client") as mock_spotify:
@@ -42,7 +40,6 @@ class TestAuthEndpoints:
             assert response.status_code == 500
             assert "Failed to initiate login" in response.json()["detail"]
 
-    @pytest.mark.asyncio
     async def test_callback_endpoint_error_parameter(self, client):
         """Test callback endpoint with error parameter."""
         # The callback endpoint requires a 'code' parameter, so passing only 'error' returns 422
@@ -50,7 +47,6 @@ class TestAuthEndpoints:
 
         assert response.status_code == 422
 
-    @pytest.mark.asyncio
     @patch("src.unwrapped.auth.router.spotify_auth_client")
     @patch("src.unwrapped.auth.router.UserService")
     async def test_callback_endpoint_success(
@@ -88,7 +84,6 @@ class TestAuthEndpoints:
         # The actual redirect URL contains 'token=' not 'access_token='
         assert "token=" in response.headers["location"]
 
-    @pytest.mark.asyncio
     @patch("src.unwrapped.auth.router.spotify_auth_client")
     async def test_callback_endpoint_spotify_error(self, mock_spotify, client):
         """Test callback endpoint with Spotify API error."""
@@ -101,12 +96,9 @@ class TestAuthEndpoints:
         assert response.status_code == 302
         assert "error=" in response.headers["location"]
 
-    @pytest.mark.asyncio
-    async def test_me_endpoint_success(self, client, test_user, valid_jwt_token):
+    async def test_me_endpoint_success(self, client, test_user, auth_headers):
         """Test getting current user profile."""
-        headers = {"Authorization": f"Bearer {valid_jwt_token}"}
-
-        response = await client.get("/api/v1/auth/me", headers=headers)
+        response = await client.get("/api/v1/auth/me", headers=auth_headers)
 
         assert response.status_code == 200
         data = response.json()
@@ -114,25 +106,24 @@ class TestAuthEndpoints:
         assert data["email"] == test_user.email
         assert data["display_name"] == test_user.display_name
 
-    @pytest.mark.asyncio
-    async def test_me_endpoint_no_token(self, client):
+    @pytest.mark.no_db
+    async def test_me_endpoint_no_token(self, http_client):
         """Test getting current user without token."""
-        response = await client.get("/api/v1/auth/me")
+        response = await http_client.get("/api/v1/auth/me")
 
         assert (
             response.status_code == 403
         )  # FastAPI security returns 403 for missing auth
 
-    @pytest.mark.asyncio
-    async def test_me_endpoint_invalid_token(self, client):
+    @pytest.mark.no_db
+    async def test_me_endpoint_invalid_token(self, http_client):
         """Test getting current user with invalid token."""
         headers = {"Authorization": "Bearer invalid_token"}
 
-        response = await client.get("/api/v1/auth/me", headers=headers)
+        response = await http_client.get("/api/v1/auth/me", headers=headers)
 
         assert response.status_code == 401
 
-    @pytest.mark.asyncio
     async def test_me_endpoint_user_not_found(self, client):
         """Test getting current user when user doesn't exist in database."""
         # Create token for non-existent user
@@ -143,21 +134,18 @@ class TestAuthEndpoints:
 
         assert response.status_code == 404
 
-    @pytest.mark.asyncio
-    async def test_logout_endpoint(self, client):
+    @pytest.mark.no_db
+    async def test_logout_endpoint(self, http_client):
         """Test logout endpoint."""
-        response = await client.post("/api/v1/auth/logout")
+        response = await http_client.post("/api/v1/auth/logout")
 
         assert response.status_code == 200
         data = response.json()
         assert "Logged out successfully" in data["message"]
 
-    @pytest.mark.asyncio
-    async def test_status_endpoint_success(self, client, test_user, valid_jwt_token):
+    async def test_status_endpoint_success(self, client, test_user, auth_headers):
         """Test getting authentication status with valid token."""
-        headers = {"Authorization": f"Bearer {valid_jwt_token}"}
-
-        response = await client.get("/api/v1/auth/status", headers=headers)
+        response = await client.get("/api/v1/auth/status", headers=auth_headers)
 
         assert response.status_code == 200
         data = response.json()
@@ -168,25 +156,24 @@ class TestAuthEndpoints:
         assert "spotify_connected" in data
         assert "spotify_token_valid" in data
 
-    @pytest.mark.asyncio
-    async def test_status_endpoint_no_token(self, client):
+    @pytest.mark.no_db
+    async def test_status_endpoint_no_token(self, http_client):
         """Test status endpoint without token."""
-        response = await client.get("/api/v1/auth/status")
+        response = await http_client.get("/api/v1/auth/status")
 
         assert (
             response.status_code == 403
         )  # FastAPI security returns 403 for missing auth
 
-    @pytest.mark.asyncio
-    async def test_status_endpoint_invalid_token(self, client):
+    @pytest.mark.no_db
+    async def test_status_endpoint_invalid_token(self, http_client):
         """Test status endpoint with invalid token."""
         headers = {"Authorization": "Bearer invalid_token"}
 
-        response = await client.get("/api/v1/auth/status", headers=headers)
+        response = await http_client.get("/api/v1/auth/status", headers=headers)
 
         assert response.status_code == 401
 
-    @pytest.mark.asyncio
     async def test_status_endpoint_user_not_found(self, client):
         """Test status endpoint when user doesn't exist in database."""
         token = create_user_token(99999)
@@ -196,14 +183,11 @@ class TestAuthEndpoints:
 
         assert response.status_code == 404
 
-    @pytest.mark.asyncio
     async def test_status_endpoint_token_validation(
-        self, client, test_user, valid_jwt_token
+        self, client, test_user, auth_headers
     ):
         """Test status endpoint validates token properly."""
-        headers = {"Authorization": f"Bearer {valid_jwt_token}"}
-
-        response = await client.get("/api/v1/auth/status", headers=headers)
+        response = await client.get("/api/v1/auth/status", headers=auth_headers)
 
         assert response.status_code == 200
         data = response.json()
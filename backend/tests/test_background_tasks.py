@@ -0,0 +1,74 @@
+"""Tests for the music analysis background task."""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.unwrapped.music import background_tasks
+from src.unwrapped.music.models import AnalysisStatus, MusicAnalysisResult
+from src.unwrapped.music.sharing import SHARE_TOKEN_CONSTRAINT
+from tests.utils.fakes import unique_violation
+
+ANALYSIS_RESULT = {
+    "rating_text": "INDIE DARLING",
+    "rating_description": "Test description",
+    "critical_acclaim_score": 0.7,
+    "music_snob_score": 0.6,
+}
+
+
+@pytest.fixture
+def analysis_pipeline(monkeypatch) -> None:
+    """Stub out the Spotify fetch and AI steps of the analysis."""
+    collector = Mock(fetch_user_music_data=AsyncMock(return_value=({}, True)))
+    monkeypatch.setattr(
+        background_tasks, "SpotifyDataCollector", Mock(return_value=collector)
+    )
+    monkeypatch.setattr(
+        background_tasks,
+        "analyze_music_with_ai",
+        AsyncMock(return_value=ANALYSIS_RESULT),
+    )
+
+
+def make_session(analysis: MusicAnalysisResult, *commits: object) -> Mock:
+    """Build a session that loads the analysis and commits with the given results."""
+    return Mock(
+        execute=AsyncMock(
+            return_value=Mock(scalar_one_or_none=Mock(return_value=analysis))
+        ),
+        commit=AsyncMock(side_effect=commits),
+        rollback=AsyncMock(),
+    )
+
+
+@pytest.mark.usefixtures("analysis_pipeline")
+async def test_share_token_collision_is_retried() -> None:
+    """Test that a share_token collision is retried with a fresh token."""
+    analysis = MusicAnalysisResult(id=1, user_id=1)
+    # Commits: PROCESSING, colliding COMPLETED, retried COMPLETED
+    session = make_session(
+        analysis, None, unique_violation(SHARE_TOKEN_CONSTRAINT), None
+    )
+
+    await background_tasks._run_music_analysis(1, 1, session)
+
+    assert analysis.status == AnalysisStatus.COMPLETED
+    assert session.commit.await_count == 3
+    session.rollback.assert_awaited_once()
+
+
+@pytest.mark.usefixtures("analysis_pipeline")
+async def test_other_integrity_errors_fail_the_analysis() -> None:
+    """Test that violations of other constraints are not retried."""
+    analysis = MusicAnalysisResult(id=1, user_id=1)
+    # Commits: PROCESSING, violating COMPLETED, FAILED
+    session = make_session(
+        analysis, None, unique_violation("musicanalysisresult_user_id_key"), None
+    )
+
+    await background_tasks._run_music_analysis(1, 1, session)
+
+    assert analysis.status == AnalysisStatus.FAILED
+    assert session.commit.await_count == 3
+    session.rollback.assert_awaited_once()
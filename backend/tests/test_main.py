@@ -1,21 +1,65 @@
 """Tests for main application endpoints."""
 
-from fastapi.testclient import TestClient
+import pytest
+from httpx import AsyncClient
 
+from src.unwrapped.core.dependencies import get_current_user_id
+from src.unwrapped.core.exceptions import RateLimitError, SpotifyAPIError
 from src.unwrapped.main import app
+from src.unwrapped.music.analysis_service import get_analysis_service
 
-client = TestClient(app)
 
-
-def test_root_endpoint() -> None:
+@pytest.mark.no_db
+async def test_root_endpoint(http_client: AsyncClient) -> None:
     """Test the root endpoint."""
-    response = client.get("/")
+    response = await http_client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "unwrapped.fm API is running!"}
 
 
-def test_health_check() -> None:
+@pytest.mark.no_db
+async def test_health_check(http_client: AsyncClient) -> None:
     """Test the health check endpoint."""
-    response = client.get("/health")
+    response = await http_client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
+
+
+async def test_spotify_api_error_returns_bad_gateway(http_client: AsyncClient) -> None:
+    """Test that upstream service errors surface as 502 with their message."""
+
+    class FailingAnalysisService:
+        async def get_latest_analysis(self, user_id: int) -> None:
+            raise SpotifyAPIError("Failed to fetch music data")
+
+    previous = app.dependency_overrides.copy()
+    app.dependency_overrides[get_analysis_service] = FailingAnalysisService
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    try:
+        response = await http_client.get("/api/v1/music/analysis/latest")
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+
+    assert response.status_code == 502
+    assert response.json() == {"detail": "Failed to fetch music data"}
+
+
+async def test_rate_limit_error_keeps_its_status(http_client: AsyncClient) -> None:
+    """Test that errors with an explicit status are not turned into 502."""
+
+    class RateLimitedAnalysisService:
+        async def get_latest_analysis(self, user_id: int) -> None:
+            raise RateLimitError()
+
+    previous = app.dependency_overrides.copy()
+    app.dependency_overrides[get_analysis_service] = RateLimitedAnalysisService
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    try:
+        response = await http_client.get("/api/v1/music/analysis/latest")
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Rate limit exceeded"}
@@ -1,6 +1,5 @@
 """Tests for public endpoints (no authentication required)."""
 
-import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,7 +9,6 @@ from src.unwrapped.music.models import AnalysisStatus, MusicAnalysisResult
 class TestPublicEndpoints:
     """Test public endpoints that don't require authentication."""
 
-    @pytest.mark.asyncio
     async def test_get_shared_analysis_success(
         self, client: AsyncClient, test_user, async_session: AsyncSession
     ):
@@ -26,7 +24,7 @@ class TestPublicEndpoints:
             share_token="test_share_token_123",
         )
         async_session.add(analysis)
-        await async_session.commit()
+        await async_session.flush()
 
         # Test the public endpoint
         response = await client.get("/api/v1/public/share/test_share_token_123")
@@ -48,7 +46,6 @@ class TestPublicEndpoints:
         assert "share_token" not in data
         assert "user_id" not in data
 
-    @pytest.mark.asyncio
     async def test_get_shared_analysis_not_found(self, client: AsyncClient):
         """Test retrieval with invalid share token."""
         response = await client.get("/api/v1/public/share/invalid_token")
@@ -56,7 +53,6 @@ class TestPublicEndpoints:
         assert response.status_code == 404
         assert response.json()["detail"] == "Analysis not found"
 
-    @pytest.mark.asyncio
     async def test_get_shared_analysis_incomplete(
         self, client: AsyncClient, test_user, async_session: AsyncSession
     ):
@@ -68,7 +64,7 @@ class TestPublicEndpoints:
             share_token="pending_token_123",
         )
         async_session.add(analysis)
-        await async_session.commit()
+        await async_session.flush()
 
         # Test the public endpoint
         response = await client.get("/api/v1/public/share/pending_token_123")
@@ -76,7 +72,6 @@ class TestPublicEndpoints:
         assert response.status_code == 404
         assert response.json()["detail"] == "Analysis not found"
 
-    @pytest.mark.asyncio
     async def test_get_shared_analysis_missing_data(
         self, client: AsyncClient, test_user, async_session: AsyncSession
     ):
@@ -90,7 +85,7 @@ class TestPublicEndpoints:
             share_token="incomplete_token_123",
         )
         async_session.add(analysis)
-        await async_session.commit()
+        await async_session.flush()
 
         # Test the public endpoint
         response = await client.get("/api/v1/public/share/incomplete_token_123")
@@ -0,0 +1,53 @@
+"""Tests for result persistence."""
+
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.unwrapped.core.exceptions import SpotifyAPIError
+from src.unwrapped.music.result_persister import ResultPersister
+from src.unwrapped.music.sharing import SHARE_TOKEN_CONSTRAINT
+from tests.utils.fakes import unique_violation
+
+ANALYSIS_RESULT = {
+    "rating_text": "INDIE DARLING",
+    "rating_description": "Test description",
+    "critical_acclaim_score": 0.7,
+    "music_snob_score": 0.6,
+}
+
+
+def make_session(*results: object) -> Mock:
+    """Build a session whose execute() raises or returns each result in turn."""
+    return Mock(
+        execute=AsyncMock(side_effect=results),
+        commit=AsyncMock(),
+        rollback=AsyncMock(),
+    )
+
+
+async def test_share_token_collision_is_retried() -> None:
+    """Test that a share_token collision is retried with a fresh token."""
+    created_at = datetime.now(UTC)
+    session = make_session(
+        unique_violation(SHARE_TOKEN_CONSTRAINT),
+        Mock(scalar_one=Mock(return_value=created_at)),
+    )
+
+    response = await ResultPersister(session).save_analysis_result(1, ANALYSIS_RESULT)
+
+    assert response.analyzed_at == created_at
+    assert session.execute.await_count == 2
+    session.commit.assert_awaited_once()
+
+
+async def test_other_integrity_errors_are_not_retried() -> None:
+    """Test that violations of other constraints fail on the first attempt."""
+    session = make_session(unique_violation("musicanalysisresult_user_id_key"))
+
+    with pytest.raises(SpotifyAPIError, match="Failed to save analysis result"):
+        await ResultPersister(session).save_analysis_result(1, ANALYSIS_RESULT)
+
+    session.execute.assert_awaited_once()
+    session.rollback.assert_awaited_once()
@@ -0,0 +1,181 @@
+"""Tests for Spotify token refresh service."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.unwrapped.core.exceptions import SpotifyAPIError
+from src.unwrapped.music import spotify, token_refresh_service
+from src.unwrapped.music.token_refresh_service import TokenRefreshService
+
+
+def make_user(expires_in: timedelta) -> Mock:
+    """Build a user row whose access token expires after the given delay."""
+    return Mock(
+        id=1,
+        access_token="stored_access_token",
+        refresh_token="stored_refresh_token",
+        token_expires_at=datetime.now(UTC) + expires_in,
+    )
+
+
+def make_session(user: Mock) -> Mock:
+    """Build a session whose add() is sync and whose queries return the user."""
+    return Mock(
+        commit=AsyncMock(),
+        rollback=AsyncMock(),
+        refresh=AsyncMock(),
+        execute=AsyncMock(return_value=Mock(scalar_one=Mock(return_value=user))),
+    )
+
+
+async def test_valid_token_is_cached() -> None:
+    """Test that a valid token is served from cache on later calls."""
+    user = make_user(timedelta(hours=1))
+    with patch.object(token_refresh_service, "UserService") as mock_user_service:
+        mock_user_service.return_value.get_user_by_id = AsyncMock(return_value=user)
+        service = TokenRefreshService(make_session(user))
+
+        assert await service.get_valid_access_token(1) == "stored_access_token"
+        assert await service.get_valid_access_token(1) == "stored_access_token"
+
+    mock_user_service.return_value.get_user_by_id.assert_awaited_once_with(1)
+
+
+async def test_expiring_token_is_refreshed_and_cached() -> None:
+    """Test that a token about to expire is refreshed and the new one cached."""
+    user = make_user(timedelta(minutes=1))
+    spotify_client = AsyncMock()
+    spotify_client.refresh_access_token.return_value = Mock(
+        access_token="new_access_token",
+        refresh_token="new_refresh_token",
+        expires_in=3600,
+    )
+    with (
+        patch.object(token_refresh_service, "UserService") as mock_user_service,
+        patch.object(spotify, "spotify_music_client", spotify_client),
+    ):
+        mock_user_service.return_value.get_user_by_id = AsyncMock(return_value=user)
+        service = TokenRefreshService(make_session(user))
+
+        assert await service.get_valid_access_token(1) == "new_access_token"
+        assert await service.get_valid_access_token(1) == "new_access_token"
+
+    spotify_client.refresh_access_token.assert_awaited_once_with("stored_refresh_token")
+    mock_user_service.return_value.get_user_by_id.assert_awaited_once_with(1)
+
+
+async def test_concurrent_refreshes_are_coalesced() -> None:
+    """Test that concurrent callers share a single token refresh."""
+    user = make_user(timedelta(minutes=1))
+    spotify_client = AsyncMock()
+
+    async def refresh_access_token(refresh_token: str) -> Mock:
+        await asyncio.sleep(0.01)
+        return Mock(
+            access_token="new_access_token",
+            refresh_token="new_refresh_token",
+            expires_in=3600,
+        )
+
+    spotify_client.refresh_access_token.side_effect = refresh_access_token
+    with (
+        patch.object(token_refresh_service, "UserService") as mock_user_service,
+        patch.object(spotify, "spotify_music_client", spotify_client),
+    ):
+        mock_user_service.return_value.get_user_by_id = AsyncMock(return_value=user)
+        tokens = await asyncio.gather(
+            *(
+                TokenRefreshService(make_session(user)).get_valid_access_token(1)
+                for _ in range(3)
+            )
+        )
+
+    assert tokens == ["new_access_token"] * 3
+    spotify_client.refresh_access_token.assert_awaited_once()
+
+
+async def test_refresh_skipped_when_another_worker_refreshed() -> None:
+    """Test that a token refreshed elsewhere while waiting on the row lock is reused."""
+    user = make_user(timedelta(minutes=1))
+    locked_user = make_user(timedelta(hours=1))
+    locked_user.access_token = "refreshed_elsewhere_token"
+    spotify_client = AsyncMock()
+    with (
+        patch.object(token_refresh_service, "UserService") as mock_user_service,
+        patch.object(spotify, "spotify_music_client", spotify_client),
+    ):
+        mock_user_service.return_value.get_user_by_id = AsyncMock(return_value=user)
+        service = TokenRefreshService(make_session(locked_user))
+
+        assert await service.get_valid_access_token(1) == "refreshed_elsewhere_token"
+
+    spotify_client.refresh_access_token.assert_not_awaited()
+
+
+async def test_refresh_lock_is_released_after_refresh() -> None:
+    """Test that a user's refresh lock is dropped once the refresh finishes."""
+    user = make_user(timedelta(minutes=1))
+    spotify_client = AsyncMock()
+    spotify_client.refresh_access_token.return_value = Mock(
+        access_token="new_access_token",
+        refresh_token="new_refresh_token",
+        expires_in=3600,
+    )
+    with (
+        patch.object(token_refresh_service, "UserService") as mock_user_service,
+        patch.object(spotify, "spotify_music_client", spotify_client),
+    ):
+        mock_user_service.return_value.get_user_by_id = AsyncMock(return_value=user)
+        await TokenRefreshService(make_session(user)).get_valid_access_token(1)
+
+    assert 1 not in token_refresh_service._refresh_locks
+
+
+async def test_invalidated_token_is_reloaded() -> None:
+    """Test that a token rejected by Spotify is read again from the database."""
+    user = make_user(timedelta(hours=1))
+    with patch.object(token_refresh_service, "UserService") as mock_user_service:
+        mock_user_service.return_value.get_user_by_id = AsyncMock(return_value=user)
+        service = TokenRefreshService(make_session(user))
+
+        await service.get_valid_access_token(1)
+        service.invalidate_access_token(1)
+        await service.get_valid_access_token(1)
+
+    assert mock_user_service.return_value.get_user_by_id.await_count == 2
+
+
+async def test_missing_refresh_token_releases_row_lock() -> None:
+    """Test that giving up on a refresh rolls back the row-locking transaction."""
+    user = make_user(timedelta(minutes=1))
+    user.refresh_token = None
+    session = make_session(user)
+    with patch.object(token_refresh_service, "UserService") as mock_user_service:
+        mock_user_service.return_value.get_user_by_id = AsyncMock(return_value=user)
+
+        with pytest.raises(SpotifyAPIError, match="refresh token not available"):
+            await TokenRefreshService(session).get_valid_access_token(1)
+
+    session.rollback.assert_awaited_once()
+
+
+async def test_failed_refresh_releases_row_lock() -> None:
+    """Test that a failed Spotify refresh rolls back the row-locking transaction."""
+    user = make_user(timedelta(minutes=1))
+    session = make_session(user)
+    spotify_client = AsyncMock()
+    spotify_client.refresh_access_token.side_effect = SpotifyAPIError("boom")
+    with (
+        patch.object(token_refresh_service, "UserService") as mock_user_service,
+        patch.object(spotify, "spotify_music_client", spotify_client),
+    ):
+        mock_user_service.return_value.get_user_by_id = AsyncMock(return_value=user)
+
+        with pytest.raises(SpotifyAPIError, match="Failed to refresh Spotify token"):
+            await TokenRefreshService(session).get_valid_access_token(1)
+
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
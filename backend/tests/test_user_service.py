@@ -1,82 +1,47 @@
 """Tests for user service functionality."""
 
+from datetime import UTC, datetime, timedelta
+
 import pytest
 
-from src.unwrapped.auth.models import SpotifyToken, UserCreate, UserUpdate
+from src.unwrapped.auth.models import SpotifyToken, User, UserCreate, UserUpdate
 from src.unwrapped.auth.service import UserService
+from src.unwrapped.auth.token_cache import cache_token, get_cached_token
 
 
-@pytest.mark.asyncio
-class TestUserService:
-    """Test cases for UserService functionality."""
-
-    @pytest.mark.asyncio
-    async def test_get_user_by_id_existing(self, async_session, test_user):
-        """Test getting a user by ID that exists."""
-        service = UserService(async_session)
-
-        result = await service.get_user_by_id(test_user.id)
-
-        assert result is not None
-        assert result.id == test_user.id
-        assert result.spotify_id == test_user.spotify_id
-
-    @pytest.mark.asyncio
-    async def test_get_user_by_id_nonexistent(self, async_session):
-        """Test getting a user by ID that doesn't exist."""
-        service = UserService(async_session)
-
-        result = await service.get_user_by_id(99999)
-
-        assert result is None
-
-    @pytest.mark.asyncio
-    async def test_get_user_by_spotify_id_existing(self, async_session, test_user):
-        """Test getting a user by Spotify ID that exists."""
-        service = UserService(async_session)
+@pytest.fixture
+def user_service(async_session) -> UserService:
+    """UserService bound to the test's session."""
+    return UserService(async_session)
 
-        result = await service.get_user_by_spotify_id(test_user.spotify_id)
 
-        assert result is not None
-        assert result.spotify_id == test_user.spotify_id
-        assert result.id == test_user.id
-
-    @pytest.mark.asyncio
-    async def test_get_user_by_spotify_id_nonexistent(self, async_session):
-        """Test getting a user by Spotify ID that doesn't exist."""
-        service = UserService(async_session)
-
-        result = await service.get_user_by_spotify_id("nonexistent_spotify_id")
-
-        assert result is None
+class TestUserService:
+    """Test cases for UserService functionality."""
 
-    @pytest.mark.asyncio
-    async def test_get_user_by_email_existing(self, async_session, test_user):
-        """Test getting a user by email that exists."""
-        service = UserService(async_session)
+    @pytest.mark.parametrize(
+        ("field", "missing_value"),
+        [
+            ("id", 99999),
+            ("spotify_id", "nonexistent_spotify_id"),
+            ("email", "nonexistent@example.com"),
+        ],
+    )
+    async def test_get_user_by(self, user_service, test_user, field, missing_value):
+        """Test looking a user up by each unique field, present and absent."""
+        get_user = getattr(user_service, f"get_user_by_{field}")
 
-        result = await service.get_user_by_email(test_user.email)
+        result = await get_user(getattr(test_user, field))
 
         assert result is not None
-        assert result.email == test_user.email
         assert result.id == test_user.id
+        assert getattr(result, field) == getattr(test_user, field)
+        assert await get_user(missing_value) is None
 
-    @pytest.mark.asyncio
-    async def test_get_user_by_email_nonexistent(self, async_session):
-        """Test getting a user by email that doesn't exist."""
-        service = UserService(async_session)
-
-        result = await service.get_user_by_email("nonexistent@example.com")
-
-        assert result is None
-
-    @pytest.mark.asyncio
-    async def test_create_user(self, async_session, sample_user_data):
+    async def test_create_user(self, user_service, sample_user_data):
         """Test creating a new user."""
-        service = UserService(async_session)
         user_create = UserCreate(**sample_user_data)
 
-        result = await service.create_user(user_create)
+        result = await user_service.create_user(user_create)
 
         assert result is not None
         assert result.spotify_id == sample_user_data["spotify_id"]
@@ -88,18 +53,15 @@ class TestUserService:
         assert result.created_at is not None
         assert result.updated_at is not None
 
-    @pytest.mark.asyncio
-    async def test_update_user_existing(self, async_session, test_user):
+    async def test_update_user_existing(self, user_service, test_user):
         """Test updating an existing user."""
-        service = UserService(async_session)
-
         update_data = UserUpdate(
             display_name="Updated Name",
             country="CA",
             image_url="https://example.com/new_image.jpg",
         )
 
-        result = await service.update_user(test_user.id, update_data)
+        result = await user_service.update_user(test_user.id, update_data)
 
         assert result is not None
         assert result.display_name == "Updated Name"
@@ -109,21 +71,15 @@ class TestUserService:
         assert result.spotify_id == test_user.spotify_id
         assert result.email == test_user.email
 
-    @pytest.mark.asyncio
-    async def test_update_user_nonexistent(self, async_session):
+    async def test_update_user_nonexistent(self, user_service):
         """Test updating a user that doesn't exist."""
-        service = UserService(async_session)
-
         update_data = UserUpdate(display_name="New Name")
-        result = await service.update_user(99999, update_data)
+        result = await user_service.update_user(99999, update_data)
 
         assert result is None
 
-    @pytest.mark.asyncio
-    async def test_update_user_tokens_existing(self, async_session, test_user):
+    async def test_update_user_tokens_existing(self, user_service, test_user):
         """Test updating tokens for an existing user."""
-        service = UserService(async_session)
-
         new_token = SpotifyToken(
             access_token="new_access_token",
             refresh_token="new_refresh_token",
@@ -131,18 +87,15 @@ class TestUserService:
             token_type="Bearer",
         )
 
-        result = await service.update_user_tokens(test_user.id, new_token)
+        result = await user_service.update_user_tokens(test_user.id, new_token)
 
         assert result is not None
         assert result.access_token == "new_access_token"
         assert result.refresh_token == "new_refresh_token"
         assert result.token_expires_at is not None
 
-    @pytest.mark.asyncio
-    async def test_update_user_tokens_nonexistent(self, async_session):
+    async def test_update_user_tokens_nonexistent(self, user_service):
         """Test updating tokens for a user that doesn't exist."""
-        service = UserService(async_session)
-
         new_token = SpotifyToken(
             access_token="new_access_token",
             refresh_token="new_refresh_token",
@@ -150,15 +103,12 @@ class TestUserService:
             token_type="Bearer",
         )
 
-        result = await service.update_user_tokens(99999, new_token)
+        result = await user_service.update_user_tokens(99999, new_token)
 
         assert result is None
 
-    @pytest.mark.asyncio
-    async def test_create_or_update_user_from_spotify_new_user(self, async_session):
+    async def test_create_or_update_user_from_spotify_new_user(self, user_service):
         """Test creating a new user from Spotify data."""
-        service = UserService(async_session)
-
         spotify_data = {
             "id": "new_spotify_user",
             "display_name": "New Spotify User",
@@ -174,7 +124,7 @@ class TestUserService:
             token_type="Bearer",
         )
 
-        result = await service.create_or_update_user_from_spotify(
+        result = await user_service.create_or_update_user_from_spotify(
             spotify_data, spotify_token
         )
 
@@ -187,13 +137,10 @@ class TestUserService:
         assert result.access_token == "spotify_access_token"
         assert result.refresh_token == "spotify_refresh_token"
 
-    @pytest.mark.asyncio
     async def test_create_or_update_user_from_spotify_existing_user(
-        self, async_session, test_user
+        self, user_service, test_user
     ):
         """Test updating an existing user from Spotify data."""
-        service = UserService(async_session)
-
         spotify_data = {
             "id": test_user.spotify_id,
             "display_name": "Updated Display Name",
@@ -209,7 +156,7 @@ class TestUserService:
             token_type="Bearer",
         )
 
-        result = await service.create_or_update_user_from_spotify(
+        result = await user_service.create_or_update_user_from_spotify(
             spotify_data, spotify_token
         )
 
@@ -221,11 +168,28 @@ class TestUserService:
         assert result.access_token == "updated_access_token"
         assert result.refresh_token == "updated_refresh_token"
 
-    @pytest.mark.asyncio
-    async def test_create_or_update_user_from_spotify_no_images(self, async_session):
-        """Test creating user from Spotify data with no images."""
-        service = UserService(async_session)
+    async def test_create_or_update_user_from_spotify_drops_cached_token(
+        self, user_service, test_user
+    ):
+        """Test that logging in again invalidates the user's cached token."""
+        cache_token(
+            test_user.id, "cached_access_token", datetime.now(UTC) + timedelta(hours=1)
+        )
+        spotify_token = SpotifyToken(
+            access_token="new_access_token",
+            refresh_token="new_refresh_token",
+            expires_in=3600,
+            token_type="Bearer",
+        )
+
+        await user_service.create_or_update_user_from_spotify(
+            {"id": test_user.spotify_id}, spotify_token
+        )
 
+        assert get_cached_token(test_user.id, datetime.now(UTC)) is None
+
+    async def test_create_or_update_user_from_spotify_no_images(self, user_service):
+        """Test creating user from Spotify data with no images."""
         spotify_data = {
             "id": "spotify_no_image",
             "display_name": "No Image User",
@@ -241,7 +205,7 @@ class TestUserService:
             token_type="Bearer",
         )
 
-        result = await service.create_or_update_user_from_spotify(
+        result = await user_service.create_or_update_user_from_spotify(
             spotify_data, spotify_token
         )
 
@@ -249,11 +213,8 @@ class TestUserService:
         assert result.spotify_id == "spotify_no_image"
         assert result.image_url is None
 
-    @pytest.mark.asyncio
-    async def test_create_or_update_user_from_spotify_empty_images(self, async_session):
+    async def test_create_or_update_user_from_spotify_empty_images(self, user_service):
         """Test creating user from Spotify data with empty images array."""
-        service = UserService(async_session)
-
         spotify_data = {
             "id": "spotify_empty_images",
             "display_name": "Empty Images User",
@@ -269,10 +230,31 @@ class TestUserService:
             token_type="Bearer",
         )
 
-        result = await service.create_or_update_user_from_spotify(
+        result = await user_service.create_or_update_user_from_spotify(
             spotify_data, spotify_token
         )
 
         assert result is not None
         assert result.spotify_id == "spotify_empty_images"
         assert result.image_url is None
+
+    async def test_get_user_by_email_among_bulk_seeded_users(
+        self, user_service, bulk_insert
+    ):
+        """Test looking up one user among many seeded in bulk."""
+        await bulk_insert(
+            User,
+            [
+                {
+                    "spotify_id": f"bulk_spotify_{i}",
+                    "email": f"bulk{i}@example.com",
+                    "is_active": True,
+                }
+                for i in range(200)
+            ],
+        )
+
+        result = await user_service.get_user_by_email("bulk123@example.com")
+
+        assert result is not None
+        assert result.spotify_id == "bulk_spotify_123"
@@ -1,8 +1,13 @@
 """Atlas migration utilities for testing."""
 
+import hashlib
+import shutil
 import subprocess
+from functools import cache
 from pathlib import Path
 
+BACKEND_DIR = Path(__file__).parent.parent.parent
+
 
 def apply_atlas_migrations(db_url: str) -> None:
     """Apply Atlas migrations to the given database URL.
@@ -17,18 +22,18 @@ def apply_atlas_migrations(db_url: str) -> None:
         # Run Atlas migrate apply with the test database URL
         result = subprocess.run(
             ["atlas", "migrate", "apply", "--env", "test", "--url", db_url],
-            cwd=Path(__file__).parent.parent.parent,  # Run from backend directory
+            cwd=BACKEND_DIR,  # Run from backend directory
             check=False,
             capture_output=True,
-            text=True,
         )
 
+        # Output is only decoded when it is going to be reported
         if result.returncode != 0:
             error_msg = f"Atlas migration failed with exit code {result.returncode}"
             if result.stderr:
-                error_msg += f"\nStderr: {result.stderr}"
+                error_msg += f"\nStderr: {result.stderr.decode(errors='replace')}"
             if result.stdout:
-                error_msg += f"\nStdout: {result.stdout}"
+                error_msg += f"\nStdout: {result.stdout.decode(errors='replace')}"
             raise RuntimeError(error_msg)
 
     except FileNotFoundError as e:
@@ -38,18 +43,17 @@ def apply_atlas_migrations(db_url: str) -> None:
         ) from e
 
 
+@cache
 def check_atlas_available() -> bool:
     """Check if Atlas CLI is available.
 
     Returns:
-        True if Atlas CLI is available, False otherwise
+        True if the Atlas CLI is on PATH, False otherwise
     """
-    try:
-        result = subprocess.run(
-            ["atlas", "version"],
-            capture_output=True,
-            check=False,
-        )
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
+    return shutil.which("atlas") is not None
+
+
+def migrations_checksum() -> str:
+    """Checksum of the migrations directory, via Atlas's own atlas.sum."""
+    atlas_sum = BACKEND_DIR / "migrations" / "atlas.sum"
+    return hashlib.sha256(atlas_sum.read_bytes()).hexdigest()
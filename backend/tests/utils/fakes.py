@@ -0,0 +1,34 @@
+"""Lightweight fakes for external service clients."""
+
+from typing import Any
+
+from asyncpg.exceptions import UniqueViolationError
+from sqlalchemy.exc import IntegrityError
+
+
+class FakeMusicAnalysisAI:
+    """Stand-in for MusicAnalysisAI that returns a canned result.
+
+    Cheaper than an AsyncMock and enough for tests that only need the
+    analysis to succeed or fail; set ``error`` to make it raise.
+    """
+
+    def __init__(
+        self, result: dict[str, Any] | None = None, error: Exception | None = None
+    ):
+        self.result = result
+        self.error = error
+
+    async def analyze_music_taste(self, music_data: dict[str, Any]) -> dict[str, Any]:
+        if self.error is not None:
+            raise self.error
+        return self.result or {}
+
+
+def unique_violation(constraint_name: str) -> IntegrityError:
+    """Build an IntegrityError shaped like SQLAlchemy's asyncpg adapter raises."""
+    cause = UniqueViolationError("duplicate key value")
+    cause.constraint_name = constraint_name
+    orig = Exception("duplicate key value")
+    orig.__cause__ = cause
+    return IntegrityError("INSERT ...", {}, orig)